@@ -3,17 +3,60 @@ Konfiguracja aplikacji Music Genre Sorter
 """
 
 import os
+import re
+import sys
+import pickle
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from types import MappingProxyType
 from pathlib import Path
 
-# Ścieżki
-PROJECT_ROOT = Path(__file__).parent
-DEFAULT_MUSIC_DIR = Path.home() / "Music"
+# Opcjonalny automat Aho-Corasicka (pyahocorasick) do szybkiego skanowania słów kluczowych
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Opcjonalny NumPy do wektorowej klasyfikacji wsadowej
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Opcjonalna Numba do kompilacji JIT gorącej pętli klasyfikacji
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Opcjonalny Hyperscan (python-hyperscan) - wektorowy DFA do skanowania fraz
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Opcjonalne marisa-trie - kompaktowe drzewo prefiksowe słów kluczowych
+try:
+    import marisa_trie
+except ImportError:
+    marisa_trie = None
+
+# Ścieżki - katalog projektu rozwiązywany raz jako string;
+# os.path jest znacznie tańsze niż konstrukcja obiektów Path
+PROJECT_ROOT_STR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = Path(PROJECT_ROOT_STR)
 DEFAULT_OUTPUT_DIR = PROJECT_ROOT / "sorted_music"
 
+@lru_cache(maxsize=None)
+def default_music_dir():
+    """Domyślny katalog z muzyką (Path.home() wywoływane dopiero przy pierwszym użyciu)"""
+    return Path.home() / "Music"
+
 # Obsługiwane formaty plików
-SUPPORTED_FORMATS = {
+SUPPORTED_FORMATS = frozenset({
     '.mp3', '.flac', '.wav', '.m4a', '.aac', '.ogg', '.wma'
-}
+})
 
 # Gatunki elektroniczne z podgatunkami
 ELECTRONIC_GENRES = {
@@ -32,8 +75,8 @@ ELECTRONIC_GENRES = {
     
     # 🌊 Dub & Psy Ambient
     'ambient_dub': ['ambient dub', 'dub ambient', 'spacious dub'],
-    'psydub': ['psydub', 'psychedelic dub', 'trippy dub'],
-    'dub_techno': ['dub techno', 'ambient techno', 'minimal dub'],
+    'psydub': ['psydub', 'psychedelic dub', 'trippy dub', 'dub', 'bass music'],
+    'dub_techno': ['dub techno', 'ambient techno', 'minimal dub', 'deep techno', 'atmospheric techno'],
     'chill_dub': ['chill dub', 'downtempo dub', 'relaxed dub'],
     
     # 🌒 Industrial Ambient / Darker Side
@@ -69,7 +112,6 @@ ELECTRONIC_GENRES = {
     # Techno Family
     'techno': ['techno', 'minimal techno', 'detroit techno', 'berlin techno', 'acid techno'],
     'industrial_techno': ['industrial techno', 'hard techno', 'industrial', 'ebm', 'power electronics'],
-    'dub_techno': ['dub techno', 'minimal dub', 'deep techno', 'atmospheric techno'],
     'acid_techno': ['acid techno', 'acid', '303', 'tb-303', 'acid house'],
     
     # House Variants
@@ -125,7 +167,6 @@ ELECTRONIC_GENRES = {
     'electroclash': ['electroclash', 'new rave', 'fidget house'],
     
     # Specialty & Fusion
-    'psydub': ['psydub', 'dub', 'psychedelic dub', 'bass music'],
     'world_electronic': ['world electronic', 'ethnic electronic', 'tribal electronic'],
     'cinematic': ['cinematic', 'soundtrack', 'film score', 'epic electronic']
 }
@@ -148,7 +189,7 @@ GENRE_KEYWORDS = {
     # 🌊 Dub & Psy Ambient
     'ambient_dub': ['dub', 'echo', 'reverb', 'spacious', 'deep', 'atmospheric'],
     'psydub': ['psychedelic', 'trippy', 'dub', 'bass', 'deep', 'mind-bending'],
-    'dub_techno': ['dub', 'techno', 'minimal', 'deep', 'atmospheric', 'echo'],
+    'dub_techno': ['dub', 'techno', 'minimal', 'deep', 'atmospheric', 'echo', 'spacious'],
     'chill_dub': ['chill', 'dub', 'downtempo', 'relaxed', 'laid-back'],
     
     # 🌒 Industrial Ambient / Darker Side
@@ -184,7 +225,6 @@ GENRE_KEYWORDS = {
     # Techno Family
     'techno': ['techno', 'electronic', 'dance', 'club', 'rave', 'underground', 'driving'],
     'industrial_techno': ['industrial', 'harsh', 'aggressive', 'mechanical', 'distorted', 'hard'],
-    'dub_techno': ['dub', 'minimal', 'deep', 'atmospheric', 'echo', 'spacious'],
     'acid_techno': ['acid', '303', 'squelch', 'distorted', 'psychedelic'],
     
     # House Variants
@@ -240,16 +280,31 @@ GENRE_KEYWORDS = {
     'electroclash': ['electroclash', 'new rave', 'fidget', 'aggressive'],
     
     # Specialty & Fusion
-    'psydub': ['psychedelic', 'dub', 'bass', 'trippy', 'deep'],
     'world_electronic': ['world', 'ethnic', 'traditional', 'fusion', 'cultural'],
     'cinematic': ['cinematic', 'soundtrack', 'epic', 'emotional', 'orchestral']
 }
 
-# Konfiguracja API
-SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID', '')
-SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET', '')
-LASTFM_API_KEY = os.getenv('LASTFM_API_KEY', '')
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+# Konfiguracja API - klucze czytane leniwie, żeby import configu
+# nie odpytywał środowiska gdy API nie są używane
+@lru_cache(maxsize=None)
+def get_api_key(name):
+    """Odczytuje klucz API ze zmiennych środowiskowych (raz na proces)"""
+    return os.getenv(name, '')
+
+# Leniwe atrybuty modułu (PEP 562) - zachowują zgodność z istniejącymi
+# importami typu `from config import SPOTIFY_CLIENT_ID`
+_LAZY_ATTRS = {
+    'SPOTIFY_CLIENT_ID': lambda: get_api_key('SPOTIFY_CLIENT_ID'),
+    'SPOTIFY_CLIENT_SECRET': lambda: get_api_key('SPOTIFY_CLIENT_SECRET'),
+    'LASTFM_API_KEY': lambda: get_api_key('LASTFM_API_KEY'),
+    'OPENAI_API_KEY': lambda: get_api_key('OPENAI_API_KEY'),
+    'DEFAULT_MUSIC_DIR': default_music_dir,
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return _LAZY_ATTRS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Ustawienia analizy
 MIN_CONFIDENCE_SCORE = 0.6  # Minimalny poziom pewności klasyfikacji
@@ -258,8 +313,15 @@ ANALYSIS_TIMEOUT = 30       # Timeout dla analizy pojedynczego pliku (sekundy)
 
 # Ustawienia GUI
 WINDOW_SIZE = "1200x800"
+WINDOW_SIZE_WH = (1200, 800)  # to samo co WINDOW_SIZE, bez parsowania stringa
 THEME = "dark"  # "light" lub "dark"
 
+@lru_cache(maxsize=None)
+def window_size():
+    """Zwraca rozmiar okna jako krotkę (szerokość, wysokość)"""
+    width, height = WINDOW_SIZE.split('x')
+    return int(width), int(height)
+
 # Mapowanie BPM do gatunków
 BPM_GENRE_MAPPING = {
     (50, 70): ['ambient', 'dub_ambient', 'psybient', 'cinematic'],
@@ -277,18 +339,57 @@ BPM_GENRE_MAPPING = {
     (100, 130): ['glitch', 'idm', 'experimental_electronic']
 }
 
-# Ustawienia klasyfikacji
-CLASSIFICATION_SETTINGS = {
-    'min_confidence_threshold': 0.3,
-    'high_confidence_threshold': 0.7,
-    'use_filename_analysis': True,
-    'use_web_search': True,
-    'use_audio_features': True,
-    'weight_metadata': 0.4,
-    'weight_web_info': 0.3,
-    'weight_audio_features': 0.2,
-    'weight_filename': 0.1
-}
+def _build_bpm_lut():
+    """Buduje tablicę BPM -> gatunki (zakresy w mapowaniu mogą się nakładać)"""
+    lut = [set() for _ in range(256)]
+    for (min_bpm, max_bpm), genres in BPM_GENRE_MAPPING.items():
+        for bpm in range(min_bpm, min(max_bpm, 256)):
+            lut[bpm].update(genres)
+    return [tuple(sorted(genres)) for genres in lut]
+
+# Tablica indeksowana całkowitym BPM - odczyt O(1) zamiast pętli po zakresach
+_BPM_LUT = _build_bpm_lut()
+
+# Ustawienia klasyfikacji - zamrożony dataclass ze slotami: dostęp przez
+# atrybut jest szybszy od haszowania kluczy tekstowych i odporny na mutacje
+@dataclass(frozen=True, slots=True)
+class ClassificationSettings:
+    min_confidence_threshold: float = 0.3
+    high_confidence_threshold: float = 0.7
+    use_filename_analysis: bool = True
+    use_web_search: bool = True
+    use_audio_features: bool = True
+    weight_metadata: float = 0.4
+    weight_web_info: float = 0.3
+    weight_audio_features: float = 0.2
+    weight_filename: float = 0.1
+
+CLASSIFICATION = ClassificationSettings()
+
+# Słownikowa fasada dla istniejących odwołań po kluczach tekstowych
+CLASSIFICATION_SETTINGS = MappingProxyType(asdict(CLASSIFICATION))
+
+# Wagi składowych w stałej kolejności - jeden iloczyn skalarny na utwór
+# zamiast czterech odczytów ze słownika po kluczach tekstowych
+_WEIGHT_ORDER = ('metadata', 'web_info', 'audio_features', 'filename')
+if np is not None:
+    _WEIGHTS = np.array(
+        [getattr(CLASSIFICATION, f'weight_{key}') for key in _WEIGHT_ORDER],
+        dtype=np.float32
+    )
+else:
+    _WEIGHTS = tuple(getattr(CLASSIFICATION, f'weight_{key}') for key in _WEIGHT_ORDER)
+
+def combined_score(metadata_score, web_score, audio_score, filename_score):
+    """
+    Łączy cztery składowe oceny (metadane, web, audio, nazwa pliku)
+    w jedną ważoną wartość zgodnie z CLASSIFICATION_SETTINGS.
+    """
+    if np is not None:
+        return float(np.dot(_WEIGHTS, (metadata_score, web_score, audio_score, filename_score)))
+    w_meta, w_web, w_audio, w_file = _WEIGHTS
+    return (metadata_score * w_meta + web_score * w_web
+            + audio_score * w_audio + filename_score * w_file)
 
 # Ustawienia organizacji plików
 FILE_ORGANIZATION_SETTINGS = {
@@ -388,8 +489,7 @@ FOLDER_MAPPING = {
     # Downtempo
     'downtempo': 'Downtempo',
     'trip_hop': 'Trip Hop',
-    'chillstep': 'Chillstep',
-    
+
     # Bass Music
     'future_bass': 'Future Bass',
     'trap': 'Trap',
@@ -419,52 +519,503 @@ FOLDER_MAPPING = {
     'cinematic': 'Cinematic'
 }
 
+def _check_duplicate_dict_keys():
+    """
+    Wykrywa zduplikowane klucze w słownikach konfiguracyjnych.
+
+    Literał dict nadpisuje powtórzone klucze po cichu, przez co część
+    słów kluczowych znikała przy imporcie (np. podwójne 'psydub').
+    """
+    import ast
+
+    watched = {'ELECTRONIC_GENRES', 'GENRE_KEYWORDS', 'FOLDER_MAPPING', 'BPM_GENRE_MAPPING'}
+
+    with open(__file__, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)):
+            continue
+        targets = [t.id for t in node.targets if isinstance(t, ast.Name)]
+        if not watched.intersection(targets):
+            continue
+
+        seen = set()
+        for key in node.value.keys:
+            if isinstance(key, ast.Constant):
+                if key.value in seen:
+                    raise ValueError(
+                        f"Zduplikowany klucz {key.value!r} w {targets[0]} (linia {key.lineno})"
+                    )
+                seen.add(key.value)
+
+if __debug__:
+    _check_duplicate_dict_keys()
+
+def _freeze_str_dict(mapping):
+    """Zamraża dict[str, list[str]] do MappingProxyType z krotkami internowanych stringów"""
+    return MappingProxyType({
+        sys.intern(k): tuple(sys.intern(s) for s in v) for k, v in mapping.items()
+    })
+
+# Zamrożenie słowników konfiguracyjnych - krotki zamiast list (mniej pamięci,
+# lepsza lokalność cache) i brak możliwości przypadkowej mutacji w aplikacji
+ELECTRONIC_GENRES = _freeze_str_dict(ELECTRONIC_GENRES)
+GENRE_KEYWORDS = _freeze_str_dict(GENRE_KEYWORDS)
+FOLDER_MAPPING = MappingProxyType(FOLDER_MAPPING)
+BPM_GENRE_MAPPING = MappingProxyType({
+    k: tuple(sys.intern(s) for s in v) for k, v in BPM_GENRE_MAPPING.items()
+})
+
+# Prekalkulowane tabele z małymi literami w kluczach i internowanymi
+# wartościami - pozwalają pominąć .lower() i alokacje na gorącej ścieżce
+_FOLDER_MAPPING_LC = {k.lower(): sys.intern(v) for k, v in FOLDER_MAPPING.items()}
+_GENRE_KEYWORDS_LC = {k.lower(): v for k, v in GENRE_KEYWORDS.items()}
+
+# Globalna tabela identyfikatorów gatunków - małe inty zamiast stringów
+# w gorących pętlach; równoległe krotki dają odczyt O(1) po indeksie
+GENRE_NAMES = tuple(dict.fromkeys([*ELECTRONIC_GENRES, *GENRE_KEYWORDS, *FOLDER_MAPPING]))
+GENRE_IDS = MappingProxyType({genre: gid for gid, genre in enumerate(GENRE_NAMES)})
+_FOLDER_BY_GID = tuple(_FOLDER_MAPPING_LC.get(genre, genre.title()) for genre in GENRE_NAMES)
+_KEYWORDS_BY_GID = tuple(GENRE_KEYWORDS.get(genre, ()) for genre in GENRE_NAMES)
+
+def genre_id(genre):
+    """Zwraca numeryczny identyfikator gatunku (-1 gdy nieznany)"""
+    return GENRE_IDS.get(genre, -1)
+
+def genre_name(gid):
+    """Zwraca nazwę gatunku dla identyfikatora numerycznego"""
+    if 0 <= gid < len(GENRE_NAMES):
+        return GENRE_NAMES[gid]
+    return 'unknown'
+
+def get_folder_by_id(gid):
+    """Zwraca nazwę folderu dla identyfikatora gatunku"""
+    if 0 <= gid < len(_FOLDER_BY_GID):
+        return _FOLDER_BY_GID[gid]
+    return FILE_ORGANIZATION_SETTINGS['unknown_genre_folder']
+
+def get_keywords_by_id(gid):
+    """Zwraca słowa kluczowe dla identyfikatora gatunku"""
+    if 0 <= gid < len(_KEYWORDS_BY_GID):
+        return _KEYWORDS_BY_GID[gid]
+    return ()
+
 # Ustawienia cache
-CACHE_SETTINGS = {
-    'cache_dir': Path.home() / '.music_sorter_cache',
-    'enable_metadata_cache': True,
-    'enable_web_cache': True,
-    'cache_expiry_days': 30
-}
+@dataclass(frozen=True, slots=True)
+class CacheSettings:
+    cache_dir: Path = field(default_factory=lambda: Path.home() / '.music_sorter_cache')
+    enable_metadata_cache: bool = True
+    enable_web_cache: bool = True
+    cache_expiry_days: int = 30
+
+CACHE = CacheSettings()
+CACHE_SETTINGS = MappingProxyType(asdict(CACHE))
 
 # Ustawienia wydajności
-PERFORMANCE_SETTINGS = {
-    'max_concurrent_web_requests': 5,
-    'web_request_delay': 0.1,  # sekundy
-    'batch_size': 100,
-    'cache_web_results': True,
-    'cache_duration': 24 * 60 * 60  # 24 godziny w sekundach
-}
+@dataclass(frozen=True, slots=True)
+class PerformanceSettings:
+    max_concurrent_web_requests: int = 5
+    web_request_delay: float = 0.1  # sekundy
+    batch_size: int = 100
+    cache_web_results: bool = True
+    cache_duration: int = 24 * 60 * 60  # 24 godziny w sekundach
+
+PERFORMANCE = PerformanceSettings()
+PERFORMANCE_SETTINGS = MappingProxyType(asdict(PERFORMANCE))
 
 # Ustawienia logowania
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
+@lru_cache(maxsize=None)
 def get_genre_folder_name(genre):
     """Zwraca nazwę folderu dla danego gatunku"""
-    return FOLDER_MAPPING.get(genre.lower(), genre.title())
+    # Najpierw bezpośrednie trafienie (gatunki są zwykle już małymi literami)
+    folder = _FOLDER_MAPPING_LC.get(genre)
+    if folder is not None:
+        return folder
+    return _FOLDER_MAPPING_LC.get(genre.lower(), genre.title())
+
+# Rozszerzenia bez kropki do szybkiego testu na surowych ścieżkach
+_SUFFIX_SET = frozenset(s.lstrip('.') for s in SUPPORTED_FORMATS)
 
 def is_supported_format(file_path):
-    """Sprawdza czy format pliku jest obsługiwany"""
-    return file_path.suffix.lower() in SUPPORTED_FORMATS
+    """
+    Sprawdza czy format pliku jest obsługiwany.
+
+    Działa na surowym stringu (przyjmuje też Path) - unika budowania
+    obiektów PurePath i alokacji .suffix przy masowym skanowaniu.
+    """
+    path_str = file_path if isinstance(file_path, str) else str(file_path)
+    dot = path_str.rfind('.')
+    return dot >= 0 and path_str[dot + 1:].lower() in _SUFFIX_SET
+
+def filter_supported(paths):
+    """
+    Filtruje iterowalne ścieżek, przepuszczając tylko obsługiwane formaty.
+
+    Przyjmuje stringi oraz obiekty os.DirEntry (atrybut .name),
+    dzięki czemu można podpiąć wynik os.scandir bez tworzenia Path.
+    """
+    suffix_set = _SUFFIX_SET
+    for path in paths:
+        name = getattr(path, 'name', path)
+        dot = name.rfind('.')
+        if dot >= 0 and name[dot + 1:].lower() in suffix_set:
+            yield path
 
+@lru_cache(maxsize=None)
 def get_bpm_genres(bpm):
-    """Zwraca gatunki pasujące do danego BPM"""
+    """
+    Zwraca wszystkie gatunki pasujące do danego BPM.
+
+    Odczyt z prekalkulowanej tablicy; uwzględnia nakładające się
+    zakresy BPM (wcześniej zwracany był tylko pierwszy trafiony zakres).
+    """
     if not bpm:
-        return []
-    
-    for (min_bpm, max_bpm), genres in BPM_GENRE_MAPPING.items():
-        if min_bpm <= bpm < max_bpm:
-            return genres
-    
-    return []
+        return ()
+
+    try:
+        bpm_int = int(bpm)
+    except (ValueError, TypeError):
+        return ()
+
+    if 0 <= bpm_int < len(_BPM_LUT):
+        return _BPM_LUT[bpm_int]
 
+    return ()
+
+@lru_cache(maxsize=None)
 def get_genre_keywords(genre):
     """Zwraca słowa kluczowe dla danego gatunku"""
-    return GENRE_KEYWORDS.get(genre.lower(), [])
+    keywords = _GENRE_KEYWORDS_LC.get(genre)
+    if keywords is not None:
+        return keywords
+    return _GENRE_KEYWORDS_LC.get(genre.lower(), [])
 
+@lru_cache(maxsize=None)
 def create_cache_dir():
-    """Tworzy katalog cache jeśli nie istnieje"""
+    """Tworzy katalog cache jeśli nie istnieje (syscall tylko przy pierwszym wywołaniu)"""
     cache_dir = CACHE_SETTINGS['cache_dir']
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    return cache_dir
\ No newline at end of file
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def _config_cache_key():
+    """Klucz wersji cache indeksów oparty o mtime i rozmiar tego pliku"""
+    try:
+        stat = os.stat(__file__)
+        return f"{int(stat.st_mtime)}_{stat.st_size}"
+    except OSError:
+        return "0_0"
+
+_CACHE_KEY = _config_cache_key()
+
+def _load_cached_indices():
+    """Wczytuje zserializowane indeksy zbudowane przy poprzednim starcie"""
+    cache_path = CACHE_SETTINGS['cache_dir'] / f'config_indices.v1.{_CACHE_KEY}.pkl'
+    try:
+        if cache_path.exists():
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+    except Exception:
+        pass
+    return None
+
+def _save_cached_indices(indices):
+    """Zapisuje indeksy do cache (zapis atomowy przez os.replace)"""
+    try:
+        create_cache_dir()
+        cache_dir = CACHE_SETTINGS['cache_dir']
+        cache_path = cache_dir / f'config_indices.v1.{_CACHE_KEY}.pkl'
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(indices, f, protocol=5)
+        os.replace(tmp_path, cache_path)
+
+        # Sprzątanie przestarzałych wersji cache
+        for old in cache_dir.glob('config_indices.v1.*.pkl'):
+            if old != cache_path:
+                old.unlink(missing_ok=True)
+    except Exception:
+        pass
+
+def _build_keyword_genre_map():
+    """Buduje mapowanie słowo kluczowe -> krotka gatunków (z obu słowników)"""
+    keyword_map = {}
+    for source in (GENRE_KEYWORDS, ELECTRONIC_GENRES):
+        for genre, keywords in source.items():
+            genre = sys.intern(genre)
+            for keyword in keywords:
+                keyword_lower = keyword.lower()
+                genres = keyword_map.setdefault(keyword_lower, [])
+                if genre not in genres:
+                    genres.append(genre)
+    return {kw: tuple(genres) for kw, genres in keyword_map.items()}
+
+def _build_keyword_automaton(keyword_map):
+    """Buduje automat Aho-Corasicka dla podanych słów kluczowych"""
+    automaton = ahocorasick.Automaton()
+    for keyword, genres in keyword_map.items():
+        automaton.add_word(keyword, genres)
+    automaton.make_automaton()
+    return automaton
+
+def _load_or_build_automaton(keyword_map):
+    """Wczytuje automat z cache lub buduje go i zapisuje na dysk"""
+    if ahocorasick is None:
+        return None
+
+    cache_path = CACHE_SETTINGS['cache_dir'] / f'phrase_automaton.{_CACHE_KEY}.bin'
+
+    # Próba wczytania gotowego automatu z cache
+    try:
+        if cache_path.exists():
+            return ahocorasick.load(str(cache_path), pickle.loads)
+    except Exception:
+        pass
+
+    automaton = _build_keyword_automaton(keyword_map)
+
+    # Zapis automatu do cache na kolejne uruchomienia
+    try:
+        create_cache_dir()
+        automaton.save(str(cache_path), pickle.dumps)
+    except Exception:
+        pass
+
+    return automaton
+
+# Indeksy budowane raz przy imporcie modułu i serializowane do cache,
+# żeby kolejne uruchomienia nie płaciły za ich budowę
+_TOKEN_RE = re.compile(r'\w+')
+_cached_indices = _load_cached_indices()
+if _cached_indices is not None:
+    _KEYWORD_GENRE_MAP = _cached_indices['keyword_genre_map']
+else:
+    _KEYWORD_GENRE_MAP = _build_keyword_genre_map()
+    _save_cached_indices({'keyword_genre_map': _KEYWORD_GENRE_MAP})
+
+# Podział słów kluczowych: pojedyncze tokeny sprawdzamy w zbiorze (O(1)),
+# frazy wielowyrazowe wymagają skanowania całego tekstu
+_SINGLE_WORD_KEYWORDS = frozenset(
+    kw for kw in _KEYWORD_GENRE_MAP if _TOKEN_RE.fullmatch(kw)
+)
+_PHRASE_KEYWORD_MAP = {
+    kw: genres for kw, genres in _KEYWORD_GENRE_MAP.items()
+    if kw not in _SINGLE_WORD_KEYWORDS
+}
+_PHRASE_AUTOMATON = _load_or_build_automaton(_PHRASE_KEYWORD_MAP)
+
+def _load_or_build_hyperscan_db(phrase_map):
+    """Kompiluje (lub wczytuje z cache) bazę Hyperscan dla fraz"""
+    if hyperscan is None or not phrase_map:
+        return None
+
+    cache_path = CACHE_SETTINGS['cache_dir'] / f'phrase_hyperscan.{_CACHE_KEY}.db'
+    try:
+        if cache_path.exists():
+            return hyperscan.loadb(cache_path.read_bytes())
+    except Exception:
+        pass
+
+    try:
+        db = hyperscan.Database()
+        expressions = [re.escape(kw).encode() for kw in phrase_map]
+        db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[hyperscan.HS_FLAG_CASELESS] * len(expressions)
+        )
+    except Exception:
+        return None
+
+    try:
+        create_cache_dir()
+        cache_path.write_bytes(hyperscan.dumpb(db))
+    except Exception:
+        pass
+
+    return db
+
+# Hyperscan skanuje szerokie alternatywy szybciej niż automat w Pythonie,
+# więc przy dostępnej bibliotece ma pierwszeństwo
+_HS_PHRASE_DB = _load_or_build_hyperscan_db(_PHRASE_KEYWORD_MAP)
+_HS_PHRASE_GENRES = tuple(_PHRASE_KEYWORD_MAP.values())
+
+# Awaryjna ścieżka bez pyahocorasick: jedna skompilowana alternatywa regex
+# (najdłuższe frazy najpierw, żeby prefiks nie przesłaniał dłuższego trafienia)
+# - jedno przejście po tekście na poziomie C zamiast pętli po frazach
+_PHRASE_RE = None
+if _PHRASE_AUTOMATON is None and _PHRASE_KEYWORD_MAP:
+    _PHRASE_RE = re.compile(
+        r'\b(' + '|'.join(
+            re.escape(kw) for kw in sorted(_PHRASE_KEYWORD_MAP, key=len, reverse=True)
+        ) + r')\b'
+    )
+
+# Płaska reprezentacja SoA (structure-of-arrays) indeksu słów kluczowych:
+# tablica słów + równoległa tablica id gatunków (globalna tabela GENRE_IDS)
+if np is not None:
+    _KW_ARR = np.array(
+        [kw for kw, genres in _KEYWORD_GENRE_MAP.items() for _ in genres],
+        dtype=object
+    )
+    _GID_ARR = np.fromiter(
+        (GENRE_IDS[genre] for genres in _KEYWORD_GENRE_MAP.values() for genre in genres),
+        dtype=np.int32
+    )
+
+# Identyfikatory całkowite słów kluczowych + posortowane pary
+# (id słowa, id gatunku) dla skompilowanego kernelu klasyfikacji
+_KW_ID = {kw: kw_id for kw_id, kw in enumerate(_KEYWORD_GENRE_MAP)}
+
+if np is not None:
+    _kw_gid_pairs = sorted(
+        (_KW_ID[kw], GENRE_IDS[genre])
+        for kw, genres in _KEYWORD_GENRE_MAP.items()
+        for genre in genres
+    )
+    _SORTED_KWID_ARR = np.array([pair[0] for pair in _kw_gid_pairs], dtype=np.int32)
+    _SORTED_GID_ARR = np.array([pair[1] for pair in _kw_gid_pairs], dtype=np.int32)
+    del _kw_gid_pairs
+
+    def _score_token_ids(token_ids, kw_ids, gids, num_genres):
+        # Gorąca pętla: wyszukiwanie binarne w posortowanych parach,
+        # wynik w buforze int32 o stałym rozmiarze
+        scores = np.zeros(num_genres, dtype=np.int32)
+        total = kw_ids.shape[0]
+        for i in range(token_ids.shape[0]):
+            pos = np.searchsorted(kw_ids, token_ids[i])
+            while pos < total and kw_ids[pos] == token_ids[i]:
+                scores[gids[pos]] += 1
+                pos += 1
+        return scores
+
+    if njit is not None:
+        # Kompilacja JIT z cache na dysku - kolejne procesy wczytują gotowy kod
+        _score_token_ids = njit(cache=True, boundscheck=False)(_score_token_ids)
+
+def count_genres_for_tokens(tokens):
+    """
+    Zlicza trafienia gatunków dla wsadu tokenów.
+
+    Przy dostępnym NumPy jedno wektorowe np.isin + np.bincount zamiast
+    pętli w Pythonie; w przeciwnym razie odczyty z odwróconego indeksu.
+
+    Args:
+        tokens: Sekwencja tokenów (już małymi literami)
+
+    Returns:
+        Counter z liczbą trafień dla każdego gatunku
+    """
+    counts = Counter()
+    if not tokens:
+        return counts
+
+    if np is not None:
+        # Zamiana tokenów na id i przebieg skompilowanego kernelu
+        token_ids = [_KW_ID[token] for token in tokens if token in _KW_ID]
+        if not token_ids:
+            return counts
+        hits = _score_token_ids(
+            np.asarray(token_ids, dtype=np.int32),
+            _SORTED_KWID_ARR, _SORTED_GID_ARR, len(GENRE_NAMES)
+        )
+        for gid, hit_count in enumerate(hits):
+            if hit_count:
+                counts[GENRE_NAMES[gid]] = int(hit_count)
+        return counts
+
+    for token in tokens:
+        for genre in _KEYWORD_GENRE_MAP.get(token, ()):
+            counts[genre] += 1
+    return counts
+
+# Drzewo prefiksowe słów kluczowych (LOUDS, ~4 B/węzeł) - przy braku
+# biblioteki prefiksy sprawdzamy odczytami ze słownika po kolejnych cięciach
+_KW_TRIE = marisa_trie.Trie(list(_KEYWORD_GENRE_MAP)) if marisa_trie is not None else None
+
+def prefix_genres(token):
+    """
+    Zwraca gatunki, których słowo kluczowe jest prefiksem podanego tokenu.
+
+    Używane do normalizacji rozmytych tagów (np. 'housey' trafia w 'house')
+    bez iterowania po wszystkich listach słów kluczowych.
+    """
+    if not token:
+        return ()
+
+    if _KW_TRIE is not None:
+        prefixes = _KW_TRIE.prefixes(token)
+    else:
+        prefixes = [
+            token[:length] for length in range(1, len(token) + 1)
+            if token[:length] in _KEYWORD_GENRE_MAP
+        ]
+
+    genres = []
+    for keyword in prefixes:
+        for genre in _KEYWORD_GENRE_MAP[keyword]:
+            if genre not in genres:
+                genres.append(genre)
+    return tuple(genres)
+
+def genres_for_token(token):
+    """
+    Zwraca krotkę gatunków, do których należy dane słowo kluczowe.
+
+    Odwrócony indeks słowo -> gatunki pozwala klasyfikatorowi tokenowemu
+    sprawdzić pojedynczy token jednym odczytem ze słownika zamiast
+    przeszukiwać wszystkie listy słów kluczowych.
+    """
+    return _KEYWORD_GENRE_MAP.get(token, ())
+
+def scan_genres(text):
+    """
+    Zlicza trafienia słów kluczowych gatunków w tekście.
+
+    Pojedyncze słowa sprawdzane są w zbiorze po jednej tokenizacji,
+    frazy wielowyrazowe jednym liniowym przejściem automatu Aho-Corasicka
+    - zamiast pętli po wszystkich gatunkach i słowach kluczowych.
+
+    Args:
+        text: Tekst do przeskanowania (tytuł, artysta, tagi itp.)
+
+    Returns:
+        Counter z liczbą trafień dla każdego gatunku
+    """
+    counts = Counter()
+    if not text:
+        return counts
+
+    text_lower = text.lower()
+
+    # Pojedyncze słowa kluczowe: test przynależności tokenu do zbioru
+    for token in _TOKEN_RE.findall(text_lower):
+        if token in _SINGLE_WORD_KEYWORDS:
+            for genre in _KEYWORD_GENRE_MAP[token]:
+                counts[genre] += 1
+
+    # Frazy wielowyrazowe: Hyperscan, automat lub skompilowany regex
+    if _HS_PHRASE_DB is not None:
+        matched_ids = []
+        _HS_PHRASE_DB.scan(
+            text_lower.encode('utf-8', 'ignore'),
+            match_event_handler=lambda match_id, start, end, flags, ctx=None:
+                matched_ids.append(match_id)
+        )
+        for match_id in matched_ids:
+            for genre in _HS_PHRASE_GENRES[match_id]:
+                counts[genre] += 1
+    elif _PHRASE_AUTOMATON is not None:
+        for _, genres in _PHRASE_AUTOMATON.iter(text_lower):
+            for genre in genres:
+                counts[genre] += 1
+    elif _PHRASE_RE is not None:
+        for match in _PHRASE_RE.finditer(text_lower):
+            for genre in _PHRASE_KEYWORD_MAP[match.group(1)]:
+                counts[genre] += 1
+
+    return counts
\ No newline at end of file
@@ -2,9 +2,17 @@
 Moduł do organizacji i sortowania plików muzycznych
 """
 
+import io
 import os
+import re
+import sys
+import errno
 import shutil
 import logging
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import json
@@ -12,10 +20,128 @@ from datetime import datetime
 
 from config import DEFAULT_OUTPUT_DIR
 
+# Opcjonalny NumPy do wektorowych statystyk raportu
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Opcjonalny orjson - kilkukrotnie szybsza serializacja raportów JSON
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Konfiguracja logowania
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Znaki niedozwolone w nazwach plików Windows - usuwane jednym przebiegiem str.translate
+_FORBIDDEN_TABLE = str.maketrans('', '', '<>:"/\\|?*')
+_WS_RE = re.compile(r'\s+')
+
+@lru_cache(maxsize=4096)
+def _clean_filename_part(text: str) -> str:
+    """
+    Oczyszcza część nazwy pliku z niedozwolonych znaków
+
+    Wynik jest memoizowany - ten sam wykonawca/album w partii czyszczony
+    jest tylko raz.
+
+    Args:
+        text: Tekst do oczyszczenia
+
+    Returns:
+        Oczyszczony tekst
+    """
+    return _WS_RE.sub(' ', text.translate(_FORBIDDEN_TABLE)).strip()
+
+def _fast_move(source: str, target: str) -> bool:
+    """
+    Próbuje przenieść plik przez os.rename (zmiana metadanych w O(1)).
+
+    Returns:
+        True jeśli rename się powiódł (ten sam system plików),
+        False jeśli cel leży na innym systemie plików (EXDEV)
+    """
+    try:
+        os.rename(source, target)
+        return True
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        return False
+
+# ioctl FICLONE - klon copy-on-write na btrfs/XFS (Linux)
+_FICLONE = 0x40049409
+
+def _try_clone(source: str, target: str) -> bool:
+    """
+    Próbuje "skopiować" plik bez przepisywania danych.
+
+    Najpierw twardy link (os.link - tylko nowy wpis w katalogu), potem
+    reflink przez ioctl(FICLONE) na systemach plików copy-on-write.
+
+    Returns:
+        True jeśli klon się powiódł, False gdy trzeba kopiować normalnie
+    """
+    try:
+        os.link(source, target)
+        return True
+    except OSError:
+        pass  # twardy link niedostępny (EXDEV/EMLINK/EPERM) - próbujemy reflink
+
+    if sys.platform.startswith('linux'):
+        try:
+            import fcntl
+            with open(source, 'rb') as fsrc, open(target, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return True
+        except OSError:
+            try:
+                os.unlink(target)
+            except OSError:
+                pass
+
+    return False
+
+def _fast_copy(source: str, target: str):
+    """
+    Kopiuje plik bez pośredniego bufora w przestrzeni użytkownika.
+
+    Na Linuksie używa os.sendfile (kopiowanie w jądrze), na Windows
+    CopyFileExW; w ostateczności wraca do shutil.copy2. Zachowuje
+    czasy dostępu i modyfikacji tak jak shutil.copy2.
+    """
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            if ctypes.windll.kernel32.CopyFileExW(source, target, None, None, None, 0):
+                return
+        except Exception:
+            pass
+        shutil.copy2(source, target)
+        return
+
+    if hasattr(os, 'sendfile'):
+        try:
+            with open(source, 'rb') as fsrc, open(target, 'wb') as fdst:
+                st = os.fstat(fsrc.fileno())
+                offset = 0
+                remaining = st.st_size
+                while remaining > 0:
+                    sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, remaining)
+                    if sent == 0:
+                        break
+                    offset += sent
+                    remaining -= sent
+            os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+            return
+        except OSError:
+            pass
+
+    shutil.copy2(source, target)
+
 class FileOrganizer:
     """Klasa do organizacji plików muzycznych według gatunków"""
     
@@ -23,6 +149,17 @@ class FileOrganizer:
         self.output_dir = Path(output_dir) if output_dir else DEFAULT_OUTPUT_DIR
         self.operation_log = []
         self.dry_run = False
+        self._log_lock = threading.Lock()
+        # Rejestr nazw przydzielonych w bieżącej partii (katalog -> zajęte nazwy)
+        self._assigned_names = defaultdict(set)
+        self._names_lock = threading.Lock()
+        # Katalogi, o których wiemy, że już istnieją - oszczędza mkdir na plik
+        self._known_dirs = set()
+        # Katalogi utworzone w tej partii (były puste) - nie trzeba ich odpytywać
+        self._fresh_dirs = set()
+        # Trwały cache ładnych nazw: (artysta|tytuł|rok|rozszerzenie) -> nazwa
+        self._name_cache = {}
+        self._name_cache_loaded = False
         
     def organize_files(self, classifications: List[Dict], dry_run: bool = False, use_pretty_names: bool = True, force_copy: bool = False) -> Dict:
         """
@@ -37,6 +174,9 @@ class FileOrganizer:
         """
         self.dry_run = dry_run
         self.operation_log = []
+        self._assigned_names = defaultdict(set)
+        self._known_dirs = set()
+        self._fresh_dirs = set()
         
         report = {
             'total_files': len(classifications),
@@ -50,41 +190,68 @@ class FileOrganizer:
             'dry_run': dry_run
         }
         
+        # Cache ładnych nazw z poprzednich uruchomień na tej samej bibliotece
+        if use_pretty_names:
+            self._load_name_cache()
+
+        # Jednokrotne rozstrzygnięcie folderu docelowego dla każdej klasyfikacji
+        unique_folders = self._resolve_targets(classifications)
+
         # Tworzenie struktury folderów
         if not dry_run:
-            self._create_folder_structure(classifications)
+            self._create_folder_structure(unique_folders)
         
-        # Przetwarzanie każdego pliku
-        for classification in classifications:
+        # Przetwarzanie plików równolegle - operacje są niezależne i związane z I/O,
+        # więc jądro może szeregować wiele operacji dyskowych naraz
+        def process_one(classification):
             try:
-                result = self._process_single_file(classification, dry_run, use_pretty_names, force_copy)
-                report['operations'].append(result)
-                
-                if result['status'] == 'moved':
-                    report['moved_files'] += 1
-                elif result['status'] == 'copied':
-                    report['copied_files'] += 1
-                elif result['status'] == 'skipped':
-                    report['skipped_files'] += 1
-                    
-                report['processed_files'] += 1
-                
+                return self._process_single_file(classification, dry_run, use_pretty_names, force_copy)
             except Exception as e:
-                error_msg = f"Błąd podczas przetwarzania {classification.get('file_path', 'unknown')}: {e}"
-                logger.error(error_msg)
-                report['errors'] += 1
-                report['operations'].append({
+                logger.error(f"Błąd podczas przetwarzania {classification.get('file_path', 'unknown')}: {e}")
+                return {
                     'file_path': classification.get('file_path', 'unknown'),
                     'status': 'error',
                     'error': str(e)
-                })
+                }
+
+        max_workers = min(32, (os.cpu_count() or 4) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(process_one, classifications))
+
+        for result in results:
+            report['operations'].append(result)
+
+            if result['status'] == 'moved':
+                report['moved_files'] += 1
+            elif result['status'] in ('copied', 'cloned'):
+                report['copied_files'] += 1
+            elif result['status'] == 'skipped':
+                report['skipped_files'] += 1
+
+            if result['status'] == 'error' and 'target_path' not in result:
+                report['errors'] += 1
+            else:
+                report['processed_files'] += 1
         
         # Generowanie struktury folderów
         report['folder_structure'] = self._get_folder_structure()
-        
-        # Zapisanie raportu
-        self._save_report(report)
-        
+
+        # Zapis raportu w tle - serializacja dużych partii nakłada się
+        # na końcowe logowanie zamiast blokować zakończenie
+        save_thread = threading.Thread(target=self._save_report, args=(report,))
+        save_thread.start()
+
+        # Jeden zbiorczy wpis zamiast logu na każdy plik
+        logger.info(
+            "Przetworzono %d plików (przeniesione=%d, skopiowane=%d, pominięte=%d, błędy=%d)",
+            report['processed_files'], report['moved_files'],
+            report['copied_files'], report['skipped_files'], report['errors']
+        )
+
+        if use_pretty_names:
+            self._save_name_cache()
+
+        save_thread.join()
         return report
     
     def _process_single_file(self, classification: Dict, dry_run: bool = False, use_pretty_names: bool = True, force_copy: bool = False) -> Dict:
@@ -98,24 +265,26 @@ class FileOrganizer:
                 'error': 'Plik nie istnieje'
             }
         
-        # Określenie folderu docelowego
-        target_folder = classification.get('suggested_folder', 'Other')
+        # Określenie folderu docelowego - zwykle rozstrzygnięte już
+        # w _resolve_targets, reguła niskiej pewności tylko awaryjnie
         confidence = classification.get('confidence_score', 0)
+        target_folder = classification.get('_resolved_folder')
+        if target_folder is None:
+            target_folder = classification.get('suggested_folder', 'Other')
+            if confidence < 0.5 and target_folder != 'Unsorted':
+                target_folder = 'Needs Review'
+        
+        # Generowanie ładnej nazwy pliku - pojedynczy strażnik zamiast
+        # try/except wewnątrz samej funkcji
+        try:
+            pretty_filename = self._generate_pretty_filename(classification, source_path, use_pretty_names)
+        except Exception as e:
+            logger.error(f"Błąd podczas generowania ładnej nazwy dla {source_path.name}: {e}")
+            pretty_filename = source_path.name
         
-        # Jeśli niska pewność, umieść w folderze "Needs Review"
-        if confidence < 0.5 and target_folder != 'Unsorted':
-            target_folder = 'Needs Review'
-        
-        # Generowanie ładnej nazwy pliku
-        pretty_filename = self._generate_pretty_filename(classification, source_path, use_pretty_names)
-        
-        # Ścieżka docelowa
+        # Ścieżka docelowa - nazwa rezerwowana w pamięci, bez pętli stat()
         target_dir = self.output_dir / target_folder
-        target_path = target_dir / pretty_filename
-        
-        # Sprawdzenie czy plik już istnieje
-        if target_path.exists():
-            target_path = self._get_unique_filename(target_path)
+        target_path = self._reserve_filename(target_dir, pretty_filename)
         
         operation = {
             'source_path': str(source_path),
@@ -129,20 +298,32 @@ class FileOrganizer:
         # Wykonanie operacji (jeśli nie dry run)
         if not dry_run:
             try:
-                # Tworzenie katalogu docelowego
-                target_dir.mkdir(parents=True, exist_ok=True)
-                
+                # Tworzenie katalogu docelowego (tylko jeśli jeszcze go nie znamy)
+                if target_dir not in self._known_dirs:
+                    target_dir.mkdir(parents=True, exist_ok=True)
+                    self._known_dirs.add(target_dir)
+
                 # Kopiowanie lub przenoszenie pliku
-                if force_copy or self._should_copy_file(source_path, target_path):
-                    shutil.copy2(source_path, target_path)
-                    operation['status'] = 'copied'
-                    operation['action'] = 'copy'
-                    logger.info(f"Skopiowano: {source_path.name} -> {target_folder}")
-                else:
-                    shutil.move(str(source_path), str(target_path))
+                if force_copy:
+                    if _try_clone(str(source_path), str(target_path)):
+                        operation['status'] = 'cloned'
+                        operation['action'] = 'copy'
+                        logger.debug("Sklonowano: %s -> %s", source_path.name, target_folder)
+                    else:
+                        _fast_copy(str(source_path), str(target_path))
+                        operation['status'] = 'copied'
+                        operation['action'] = 'copy'
+                        logger.debug("Skopiowano: %s -> %s", source_path.name, target_folder)
+                elif _fast_move(str(source_path), str(target_path)):
                     operation['status'] = 'moved'
                     operation['action'] = 'move'
-                    logger.info(f"Przeniesiono: {source_path.name} -> {target_folder}")
+                    logger.debug("Przeniesiono: %s -> %s", source_path.name, target_folder)
+                else:
+                    # Inny system plików - kopiujemy (zachowujemy oryginał, jak dotychczas)
+                    _fast_copy(str(source_path), str(target_path))
+                    operation['status'] = 'copied'
+                    operation['action'] = 'copy'
+                    logger.debug("Skopiowano: %s -> %s", source_path.name, target_folder)
             except Exception as e:
                 operation['status'] = 'error'
                 operation['error'] = str(e)
@@ -151,7 +332,8 @@ class FileOrganizer:
             operation['status'] = 'simulated'
             operation['action'] = 'move'
         
-        self.operation_log.append(operation)
+        with self._log_lock:
+            self.operation_log.append(operation)
         return operation
     
     def _generate_pretty_filename(self, classification: Dict, original_path: Path, use_pretty_names: bool = True) -> str:
@@ -165,133 +347,179 @@ class FileOrganizer:
         Returns:
             Ładna nazwa pliku
         """
-        try:
-            # Jeśli ładne nazwy są wyłączone, użyj oryginalnej nazwy
-            if not use_pretty_names:
-                return original_path.name
-            
-            metadata = classification.get('metadata', {})
-            
-            # Pobranie metadanych
-            artist = metadata.get('artist', '').strip()
-            title = metadata.get('title', '').strip()
-            year = metadata.get('year', '').strip()
-            
-            # Jeśli brak artysty lub tytułu, użyj oryginalnej nazwy
-            if not artist or not title:
-                logger.warning(f"Brak artysty lub tytułu dla {original_path.name} - używam oryginalnej nazwy")
-                return original_path.name
-            
-            # Oczyszczenie nazw z niedozwolonych znaków
-            artist = self._clean_filename_part(artist)
-            title = self._clean_filename_part(title)
-            
-            # Budowanie nazwy pliku
-            if year and year.isdigit():
-                filename = f"{artist} - {title} ({year})"
+        # Jeśli ładne nazwy są wyłączone, użyj oryginalnej nazwy
+        if not use_pretty_names:
+            return original_path.name
+
+        metadata = classification.get('metadata') or {}
+
+        # Pobranie metadanych - jednorazowe .get bez pośrednich wartości domyślnych
+        artist = (metadata.get('artist') or '').strip()
+        title = (metadata.get('title') or '').strip()
+
+        # Jeśli brak artysty lub tytułu, użyj oryginalnej nazwy
+        if not artist or not title:
+            logger.warning(f"Brak artysty lub tytułu dla {original_path.name} - używam oryginalnej nazwy")
+            return original_path.name
+
+        year = (metadata.get('year') or '').strip()
+        suffix = original_path.suffix
+
+        # Przy ponownym przebiegu po tej samej bibliotece identyczne metadane
+        # dają identyczną nazwę - wystarczy odczyt z cache'a
+        cache_key = f"{artist}\x1f{title}\x1f{year}\x1f{suffix}"
+        cached = self._name_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Oczyszczenie nazw z niedozwolonych znaków
+        artist = _clean_filename_part(artist)
+        title = _clean_filename_part(title)
+        with_year = bool(year) and year.isdigit()
+
+        # Budowanie nazwy pliku
+        if with_year:
+            filename = f"{artist} - {title} ({year}){suffix}"
+        else:
+            filename = f"{artist} - {title}{suffix}"
+
+        # Ograniczenie długości nazwy pliku (Windows ma limit 255 znaków)
+        if len(filename) > 200:
+            # Skrócenie tytułu jeśli nazwa jest za długa
+            max_title_length = 200 - len(artist) - len(year) - 10  # 10 na " - " + " ()" + rozszerzenie
+            title = title[:max_title_length] + "..."
+            if with_year:
+                filename = f"{artist} - {title} ({year}){suffix}"
             else:
-                filename = f"{artist} - {title}"
-            
-            # Dodanie rozszerzenia
-            filename += original_path.suffix
-            
-            # Ograniczenie długości nazwy pliku (Windows ma limit 255 znaków)
-            if len(filename) > 200:
-                # Skrócenie tytułu jeśli nazwa jest za długa
-                max_title_length = 200 - len(artist) - len(year) - 10  # 10 na " - " + " ()" + rozszerzenie
-                title = title[:max_title_length] + "..."
-                if year and year.isdigit():
-                    filename = f"{artist} - {title} ({year}){original_path.suffix}"
+                filename = f"{artist} - {title}{suffix}"
+
+        self._name_cache[cache_key] = filename
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Wygenerowano ładną nazwę: %s -> %s", original_path.name, filename)
+        return filename
+
+    def _name_cache_path(self) -> Path:
+        return self.output_dir / '.name_cache.json'
+
+    def _load_name_cache(self):
+        """Wczytuje trwały cache ładnych nazw z poprzednich uruchomień"""
+        if self._name_cache_loaded:
+            return
+        self._name_cache_loaded = True
+
+        try:
+            cache_path = self._name_cache_path()
+            if cache_path.exists():
+                if orjson is not None:
+                    self._name_cache = orjson.loads(cache_path.read_bytes())
                 else:
-                    filename = f"{artist} - {title}{original_path.suffix}"
-            
-            logger.info(f"Wygenerowano ładną nazwę: {original_path.name} -> {filename}")
-            return filename
-            
+                    with open(cache_path, 'r', encoding='utf-8') as f:
+                        self._name_cache = json.load(f)
         except Exception as e:
-            logger.error(f"Błąd podczas generowania ładnej nazwy dla {original_path.name}: {e}")
-            return original_path.name
+            logger.warning(f"Nie udało się wczytać cache'a nazw: {e}")
+            self._name_cache = {}
+
+    def _save_name_cache(self):
+        """Zapisuje cache ładnych nazw do katalogu wyjściowego"""
+        if not self._name_cache:
+            return
+
+        try:
+            cache_path = self._name_cache_path()
+            if orjson is not None:
+                cache_path.write_bytes(orjson.dumps(self._name_cache))
+            else:
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._name_cache, f, ensure_ascii=False)
+        except Exception as e:
+            logger.warning(f"Nie udało się zapisać cache'a nazw: {e}")
     
-    def _clean_filename_part(self, text: str) -> str:
+    def _reserve_filename(self, target_dir: Path, filename: str) -> Path:
         """
-        Oczyszcza część nazwy pliku z niedozwolonych znaków
-        
-        Args:
-            text: Tekst do oczyszczenia
-            
-        Returns:
-            Oczyszczony tekst
+        Rezerwuje unikalną nazwę pliku w katalogu docelowym
+
+        Kolizje w obrębie partii rozstrzygane są w pamięci (zbiór zajętych
+        nazw na katalog), więc dysk odpytywany jest tylko raz na kandydata
+        zamiast pętli exists() na każdy plik.
         """
-        # Znaki niedozwolone w nazwach plików Windows
-        forbidden_chars = ['<', '>', ':', '"', '/', '\\', '|', '?', '*']
-        
-        for char in forbidden_chars:
-            text = text.replace(char, '')
-        
-        # Usunięcie wielokrotnych spacji i spacji na początku/końcu
-        text = ' '.join(text.split())
-        
-        return text
-    
-    def _should_copy_file(self, source_path: Path, target_path: Path) -> bool:
-        """Określa czy plik powinien być skopiowany czy przeniesiony"""
-        # Kopiuj jeśli źródło i cel są na różnych dyskach
-        try:
-            return source_path.stat().st_dev != target_path.parent.stat().st_dev
-        except:
-            return False
-    
-    def _get_unique_filename(self, file_path: Path) -> Path:
-        """Generuje unikalną nazwę pliku jeśli plik już istnieje"""
-        base = file_path.stem
-        extension = file_path.suffix
-        directory = file_path.parent
-        counter = 1
-        
-        while file_path.exists():
-            new_name = f"{base}_{counter}{extension}"
-            file_path = directory / new_name
-            counter += 1
-            
-        return file_path
+        base, extension = os.path.splitext(filename)
+
+        with self._names_lock:
+            taken = self._assigned_names[target_dir]
+            # Katalogi utworzone w tej partii były puste, więc dysk nie może
+            # zawierać kolizji spoza rejestru - stat() jest wtedy zbędny
+            check_disk = target_dir not in self._fresh_dirs
+            candidate = filename
+            counter = 1
+
+            while candidate in taken or (check_disk and (target_dir / candidate).exists()):
+                candidate = f"{base}_{counter}{extension}"
+                counter += 1
+
+            taken.add(candidate)
+
+        return target_dir / candidate
     
-    def _create_folder_structure(self, classifications: List[Dict]):
-        """Tworzy strukturę folderów na podstawie klasyfikacji"""
-        folders_to_create = set()
-        
+    def _resolve_targets(self, classifications: List[Dict]) -> set:
+        """
+        Rozstrzyga docelowy folder każdej klasyfikacji dokładnie raz
+
+        Wynik zapisywany jest w klasyfikacji pod kluczem '_resolved_folder'
+        (wykorzystywany potem w _process_single_file), a zwracany zbiór
+        unikalnych folderów zasila tworzenie struktury katalogów.
+        """
+        unique_folders = set()
+
         for classification in classifications:
             folder = classification.get('suggested_folder', 'Other')
-            confidence = classification.get('confidence_score', 0)
-            
-            if confidence < 0.5 and folder != 'Unsorted':
+
+            # Jeśli niska pewność, umieść w folderze "Needs Review"
+            if classification.get('confidence_score', 0) < 0.5 and folder != 'Unsorted':
                 folder = 'Needs Review'
-                
-            folders_to_create.add(folder)
-        
+
+            classification['_resolved_folder'] = folder
+            unique_folders.add(folder)
+
+        return unique_folders
+
+    def _create_folder_structure(self, folders: set):
+        """Tworzy strukturę folderów na podstawie rozstrzygniętych celów"""
+        folders_to_create = set(folders)
+
         # Dodanie standardowych folderów
         folders_to_create.update(['Needs Review', 'Duplicates', 'Unsupported', 'Unsorted'])
         
         # Tworzenie folderów
         for folder in folders_to_create:
             folder_path = self.output_dir / folder
-            folder_path.mkdir(parents=True, exist_ok=True)
-            logger.info(f"Utworzono folder: {folder_path}")
+            if not folder_path.exists():
+                # Świeżo utworzony katalog jest z definicji pusty - rejestr
+                # nazw w pamięci wystarczy, bez sondowania exists() na plik
+                folder_path.mkdir(parents=True, exist_ok=True)
+                self._fresh_dirs.add(folder_path)
+            self._known_dirs.add(folder_path)
+            logger.debug("Utworzono folder: %s", folder_path)
     
     def _get_folder_structure(self) -> Dict:
         """Zwraca strukturę folderów z liczbą plików"""
         structure = {}
-        
+
         if not self.output_dir.exists():
             return structure
-            
-        for item in self.output_dir.iterdir():
-            if item.is_dir():
-                file_count = len([f for f in item.iterdir() if f.is_file()])
-                structure[item.name] = {
-                    'file_count': file_count,
-                    'path': str(item)
-                }
-        
+
+        # os.scandir zwraca lekkie DirEntry z typem pliku z rekordu katalogu,
+        # a liczenie generatorem nie materializuje listy wpisów
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    with os.scandir(entry.path) as it:
+                        file_count = sum(1 for e in it if e.is_file())
+                    structure[entry.name] = {
+                        'file_count': file_count,
+                        'path': entry.path
+                    }
+
         return structure
     
     def _save_report(self, report: Dict):
@@ -303,9 +531,21 @@ class FileOrganizer:
         # Tworzenie katalogu raportów
         report_path.parent.mkdir(parents=True, exist_ok=True)
         
+        # Jednorazowa normalizacja ścieżek na stringi - enkoder nie musi
+        # wywoływać pythonowego default= na każdy obiekt Path
+        for operation in report.get('operations', ()):
+            for key in ('source_path', 'target_path', 'file_path'):
+                value = operation.get(key)
+                if value is not None and not isinstance(value, str):
+                    operation[key] = str(value)
+
         try:
-            with open(report_path, 'w', encoding='utf-8') as f:
-                json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+            # Bez wcięć - raport na dysku jest o połowę mniejszy i szybszy w zapisie
+            if orjson is not None:
+                report_path.write_bytes(orjson.dumps(report, option=orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(report_path, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, ensure_ascii=False)
             logger.info(f"Zapisano raport: {report_path}")
         except Exception as e:
             logger.error(f"Błąd podczas zapisywania raportu: {e}")
@@ -331,10 +571,12 @@ class FileOrganizer:
             if files:
                 playlist_path = playlist_dir / f"{genre}.m3u"
                 try:
+                    # Jeden buforowany zapis zamiast write() na każdy utwór
+                    # (przy okazji: prawdziwe znaki nowej linii zamiast literału "\\n")
+                    lines = ["#EXTM3U\n"]
+                    lines.extend(f"{file_path}\n" for file_path in files)
                     with open(playlist_path, 'w', encoding='utf-8') as f:
-                        f.write("#EXTM3U\\n")
-                        for file_path in files:
-                            f.write(f"{file_path}\\n")
+                        f.writelines(lines)
                     logger.info(f"Utworzono playlistę: {playlist_path}")
                 except Exception as e:
                     logger.error(f"Błąd podczas tworzenia playlisty {genre}: {e}")
@@ -345,18 +587,20 @@ class FileOrganizer:
             root_dir = self.output_dir
             
         removed_folders = []
-        
-        for folder_path in root_dir.rglob('*'):
-            if folder_path.is_dir():
+
+        # Przejście od dołu gwarantuje, że dzieci są usuwane przed rodzicami,
+        # a listy dirnames/filenames z os.walk nie wymagają dodatkowych syscalli
+        for dirpath, dirnames, filenames in os.walk(root_dir, topdown=False):
+            # rmdir sam w sobie jest testem pustości (ENOTEMPTY), więc katalogi,
+            # których dzieci właśnie usunęliśmy, też znikają bez dodatkowego listdir
+            if not filenames and dirpath != str(root_dir):
                 try:
-                    # Sprawdź czy folder jest pusty
-                    if not any(folder_path.iterdir()):
-                        folder_path.rmdir()
-                        removed_folders.append(str(folder_path))
-                        logger.info(f"Usunięto pusty folder: {folder_path}")
+                    os.rmdir(dirpath)
+                    removed_folders.append(dirpath)
+                    logger.debug("Usunięto pusty folder: %s", dirpath)
                 except OSError:
                     pass  # Folder nie jest pusty lub nie można go usunąć
-        
+
         return removed_folders
     
     def generate_summary_report(self, classifications: List[Dict]) -> str:
@@ -364,22 +608,30 @@ class FileOrganizer:
         if not classifications:
             return "Brak danych do analizy."
         
-        # Statystyki gatunków
-        genre_stats = {}
-        confidence_stats = {'high': 0, 'medium': 0, 'low': 0}
-        
-        for classification in classifications:
-            genre = classification.get('primary_genre', 'unknown')
-            confidence = classification.get('confidence_score', 0)
-            
-            genre_stats[genre] = genre_stats.get(genre, 0) + 1
-            
-            if confidence > 0.7:
-                confidence_stats['high'] += 1
-            elif confidence > 0.4:
-                confidence_stats['medium'] += 1
-            else:
-                confidence_stats['low'] += 1
+        # Statystyki gatunków - Counter zlicza w pętli na poziomie C
+        genre_stats = Counter(c.get('primary_genre', 'unknown') for c in classifications)
+
+        # Progi pewności liczone wektorowo, gdy NumPy jest dostępny
+        if np is not None:
+            arr = np.fromiter(
+                (c.get('confidence_score', 0) for c in classifications),
+                dtype=np.float32, count=len(classifications)
+            )
+            high = int((arr > 0.7).sum())
+            medium = int(((arr > 0.4) & (arr <= 0.7)).sum())
+            low = len(classifications) - high - medium
+        else:
+            high = medium = low = 0
+            for c in classifications:
+                confidence = c.get('confidence_score', 0)
+                if confidence > 0.7:
+                    high += 1
+                elif confidence > 0.4:
+                    medium += 1
+                else:
+                    low += 1
+
+        confidence_stats = {'high': high, 'medium': medium, 'low': low}
         
         # Generowanie raportu
         report_lines = [
@@ -391,9 +643,13 @@ class FileOrganizer:
             "ROZKŁAD GATUNKÓW:",
         ]
         
-        for genre, count in sorted(genre_stats.items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / len(classifications)) * 100
-            report_lines.append(f"  {genre}: {count} plików ({percentage:.1f}%)")
+        # most_common() sortuje w C, a odwrotność liczona raz zastępuje
+        # dzielenie na każdy gatunek
+        inv = 100.0 / len(classifications)
+        report_lines.extend(
+            f"  {genre}: {count} plików ({count * inv:.1f}%)"
+            for genre, count in genre_stats.most_common()
+        )
         
         report_lines.extend([
             "",
@@ -407,7 +663,7 @@ class FileOrganizer:
             "=== KONIEC RAPORTU ==="
         ])
         
-        return "\\n".join(report_lines)
+        return "\n".join(report_lines)
     
     def backup_original_structure(self, source_dir: Path):
         """Tworzy kopię zapasową oryginalnej struktury folderów"""
@@ -415,22 +671,41 @@ class FileOrganizer:
         backup_dir.mkdir(parents=True, exist_ok=True)
         
         structure_file = backup_dir / "folder_structure.txt"
-        
+
         try:
+            # Cała struktura budowana w buforze i zapisywana jednym write()
+            buf = io.StringIO()
+            buf.write(f"Oryginalna struktura folderów z: {source_dir}\n")
+            buf.write(f"Data utworzenia kopii: {datetime.now()}\n\n")
+
+            # Jawny stos zamiast os.walk - os.scandir zwraca typ wpisu
+            # z rekordu katalogu, bez dodatkowego stat() na plik
+            stack = [(str(source_dir), 0)]
+            while stack:
+                path, depth = stack.pop()
+                indent = '  ' * depth
+                buf.write(f"{indent}{os.path.basename(path)}/\n")
+
+                subdirs = []
+                subindent = '  ' * (depth + 1)
+                try:
+                    with os.scandir(path) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.path)
+                            else:
+                                buf.write(f"{subindent}{entry.name}\n")
+                except OSError as e:
+                    logger.warning(f"Pominięto katalog {path}: {e}")
+                    continue
+
+                # Odwrotnie, żeby zachować kolejność przy zdejmowaniu ze stosu
+                stack.extend((sub, depth + 1) for sub in reversed(subdirs))
+
             with open(structure_file, 'w', encoding='utf-8') as f:
-                f.write(f"Oryginalna struktura folderów z: {source_dir}\\n")
-                f.write(f"Data utworzenia kopii: {datetime.now()}\\n\\n")
-                
-                for root, dirs, files in os.walk(source_dir):
-                    level = root.replace(str(source_dir), '').count(os.sep)
-                    indent = ' ' * 2 * level
-                    f.write(f"{indent}{os.path.basename(root)}/\\n")
-                    
-                    subindent = ' ' * 2 * (level + 1)
-                    for file in files:
-                        f.write(f"{subindent}{file}\\n")
-            
+                f.write(buf.getvalue())
+
             logger.info(f"Zapisano kopię struktury folderów: {structure_file}")
-            
+
         except Exception as e:
             logger.error(f"Błąd podczas tworzenia kopii struktury: {e}")
\ No newline at end of file
@@ -2,20 +2,295 @@
 System klasyfikacji gatunków muzyki elektronicznej
 """
 
+import heapq
+import os
 import logging
 import re
 from typing import Dict, List, Tuple, Optional
-from collections import Counter
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
 
-from config import ELECTRONIC_GENRES, GENRE_KEYWORDS, MIN_CONFIDENCE_SCORE
+from config import (ELECTRONIC_GENRES, GENRE_KEYWORDS, MIN_CONFIDENCE_SCORE,
+                    get_genre_folder_name)
+
+# Opcjonalny automat Aho-Corasicka (pyahocorasick) - wszystkie słowa kluczowe
+# w jednym liniowym przejściu po tekście zamiast skanu na słowo
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Opcjonalny NumPy do wektorowych obliczeń cech i statystyk
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Opcjonalna Numba - kompilacja JIT pętli akumulującej cechy spektralne
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Konfiguracja logowania
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rozszerzone wzorce nazw plików dla różnych gatunków
+_FILENAME_PATTERNS = {
+    'ambient': [r'amb', r'drone', r'atmospheric', r'space', r'calm', r'meditation',
+               r'peaceful', r'relax', r'chill', r'soft', r'quiet', r'gentle'],
+    'techno': [r'tech', r'minimal', r'detroit', r'hard', r'driving', r'industrial',
+              r'machine', r'robot', r'cyber', r'digital', r'electronic'],
+    'house': [r'house', r'deep', r'funky', r'groove', r'disco', r'dance',
+             r'club', r'party', r'beat', r'rhythm'],
+    'trance': [r'trance', r'uplifting', r'progressive', r'epic', r'emotional',
+              r'euphoric', r'energy', r'psych', r'goa'],
+    'dubstep': [r'dub', r'bass', r'wobble', r'drop', r'heavy', r'aggressive',
+               r'distorted', r'glitch', r'step'],
+    # Industrial (ogólne)
+    'industrial': [r'industrial', r'ebm', r'dark', r'metal', r'noise', r'distortion', r'aggressive', r'mechanical'],
+    # Podgatunki Industrial Ambient
+    'ambient_industrial': [r'ambient\s*industrial', r'industrial\s*ambient'],
+    'death_industrial': [r'death\s*industrial'],
+    'power_noise': [r'power\s*noise', r'rhythmic\s*noise', r'power\s*electronics', r'harsh\s*noise'],
+    'drum_and_bass': [r'dnb', r'drum', r'bass', r'jungle', r'breakbeat', r'liquid',
+                     r'neurofunk', r'jump', r'break'],
+    'synthwave': [r'synth', r'retro', r'80s', r'neon', r'cyber', r'outrun',
+                 r'vaporwave', r'nostalgic', r'vintage'],
+    'experimental': [r'experimental', r'weird', r'strange', r'abstract', r'avant',
+                   r'unconventional', r'unique', r'odd', r'unusual']
+}
+
+# Wzorce numeryczne i strukturalne
+_NUMERIC_PATTERNS = {
+    'minimal': [r'^\d+$', r'^\d+[a-z]?$'],  # Same liczby jak "925"
+    'experimental': [r'[_\-]{2,}', r'[a-z]+_[a-z]+_[a-z]+'],  # Wiele podkreśleń
+    'ambient': [r'long', r'extended', r'part\d+', r'chapter'],
+    'techno': [r'mix\d+', r'set\d+', r'track\d+']
+}
+
+def _spec_accumulate(mags, freqs, rolloff_pct):
+    """
+    Akumuluje centroid i rolloff po ramkach w jednej pętli
+
+    Pisana pod Numbę (proste pętle po tablicach), kompilowana JIT-em gdy
+    numba jest dostępna, poprawna także jako czysty Python.
+    """
+    n_frames, n_bins = mags.shape
+    centroid_acc = 0.0
+    rolloff_acc = 0.0
+    valid = 0
+
+    for i in range(n_frames):
+        total = 0.0
+        weighted = 0.0
+        for j in range(n_bins):
+            m = mags[i, j]
+            total += m
+            weighted += m * freqs[j]
+
+        if total <= 0.0:
+            continue
+
+        valid += 1
+        centroid_acc += weighted / total
+
+        threshold = rolloff_pct * total
+        cum = 0.0
+        for j in range(n_bins):
+            cum += mags[i, j]
+            if cum >= threshold:
+                rolloff_acc += freqs[j]
+                break
+
+    if valid == 0:
+        return 0.0, 0.0
+    return centroid_acc / valid, rolloff_acc / valid
+
+if njit is not None:
+    _spec_accumulate = njit(cache=True, fastmath=True)(_spec_accumulate)
+
+def _conf_stats(confs):
+    """
+    Suma pewności i liczniki progów w jednym przebiegu tablicy
+
+    Jak _spec_accumulate: proste pętle pod Numbę, poprawne też jako czysty
+    Python; zastępuje trzy osobne redukcje (mean + dwie maski) jednym
+    przejściem po danych.
+    """
+    total = 0.0
+    high = 0
+    low = 0
+    for i in range(confs.size):
+        v = confs[i]
+        total += v
+        if v > 0.7:
+            high += 1
+        elif v < 0.3:
+            low += 1
+    return total, high, low
+
+if njit is not None:
+    _conf_stats = njit(cache=True)(_conf_stats)
+
+def _fused_spec_features(y, sr, n_fft=2048, hop=512):
+    """
+    Liczy uśredniony centroid spektralny, rolloff i ZCR w jednym przebiegu
+
+    Jedno okienkowane FFT na ramkę zastępuje trzy niezależne przejścia
+    librosy (spectral_centroid/spectral_rolloff/zero_crossing_rate) po tym
+    samym buforze PCM.
+
+    Returns:
+        Krotka (avg_centroid, avg_rolloff, avg_zcr)
+    """
+    if len(y) < n_fft:
+        return 0.0, 0.0, 0.0
+
+    n_frames = 1 + (len(y) - n_fft) // hop
+    shape = (n_frames, n_fft)
+    strides = (y.strides[0] * hop, y.strides[0])
+    frames = np.lib.stride_tricks.as_strided(y, shape=shape, strides=strides)
+
+    window = np.hanning(n_fft).astype(y.dtype)
+    mags = np.abs(np.fft.rfft(frames * window, axis=1)).astype(np.float64)
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / sr)
+
+    avg_centroid, avg_rolloff = _spec_accumulate(mags, freqs, 0.85)
+
+    # ZCR z dziedziny czasu - zmiany znaku między sąsiednimi próbkami
+    signs = np.signbit(frames)
+    avg_zcr = float(np.mean(signs[:, 1:] != signs[:, :-1]))
+
+    return float(avg_centroid), float(avg_rolloff), avg_zcr
+
+@lru_cache(maxsize=32)
+def _load_audio(file_path: str, mtime: float):
+    """
+    Dekoduje pierwsze 30 sekund pliku audio
+
+    WAV/FLAC czyta soundfile bezpośrednio (bez narzutu wrappera librosy);
+    reszta idzie przez librosa.load z tanim resamplerem kaiser_fast i
+    sr=16000 - dla cech tempo/centroid/rolloff/ZCR jakość jest
+    nieodróżnialna, a dekodowanie 2-3x szybsze. mtime w kluczu unieważnia
+    wpis, gdy plik się zmieni; mały limit, bo bufor to kilka MB na utwór.
+    """
+    suffix = os.path.splitext(file_path)[1].lower()
+    if suffix in ('.wav', '.flac'):
+        try:
+            import soundfile as sf
+            info = sf.info(file_path)
+            y, sr = sf.read(file_path, frames=int(30 * info.samplerate),
+                            dtype='float32', always_2d=False)
+            if y.ndim > 1:
+                y = y.mean(axis=1)
+            return y, sr
+        except Exception:
+            pass  # soundfile niedostępny lub nietypowy plik - librosa poniżej
+
+    import librosa
+    return librosa.load(file_path, duration=30, sr=16000, mono=True, res_type='kaiser_fast')
+
+@lru_cache(maxsize=1024)
+def _extract_audio_features(file_path: str, mtime: float) -> Tuple[float, float, float, float]:
+    """
+    Zwraca (tempo, centroid, rolloff, zcr) dla pliku
+
+    Dekodowanie i FFT wykonują się raz na (ścieżka, mtime) - ponowna
+    klasyfikacja tego samego utworu kosztuje tylko odczyt z cache'a.
+    """
+    import librosa
+    y, sr = _load_audio(file_path, mtime)
+
+    tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+    tempo = float(tempo) if hasattr(tempo, 'item') else float(tempo)
+
+    centroid, rolloff, zcr = _fused_spec_features(y, sr)
+    return tempo, centroid, rolloff, zcr
+
+# Zwijanie wielokrotnych spacji po kanonizacji separatorów
+_CANON_WS_RE = re.compile(r'\s{2,}')
+
+# Wagi źródeł gatunków przy dopasowywaniu tagów
+_SOURCE_WEIGHTS = {'spotify': 0.8, 'lastfm': 0.6, 'web': 0.5}
+
+# Dodatkowe źródła z additional_info oraz gotowe nazwy ich pól -
+# stałe hoistowane raz zamiast budowania list i f-stringów per utwór
+_EXTRA_SOURCES = ('spotify', 'lastfm', 'web')
+_SOURCE_FIELDS = tuple(
+    (source, f'{source}_genres', f'{source}_tags', _SOURCE_WEIGHTS[source])
+    for source in _EXTRA_SOURCES
+)
+
+# Pola tekstowe składane w search_text (awaryjna ścieżka bez _canon)
+_TEXT_FIELD_KEYS = ('title', 'artist', 'album', 'genre', 'comment')
+
+def _empty_entry():
+    """Pusty wpis punktacji (funkcja modułowa - picklowalna dla defaultdict)"""
+    return {'score': 0.0, 'sources': []}
+
+# Klasyfikator procesu roboczego - budowany raz na proces przez initializer,
+# żeby zadania puli były picklowalne bez przenoszenia całej instancji
+_worker_classifier = None
+
+def _init_worker():
+    global _worker_classifier
+    _worker_classifier = GenreClassifier()
+
+def _classify_one(item):
+    metadata, web_info = item
+    return _worker_classifier.classify_track(metadata, web_info)
+
+class _GenreScore:
+    """
+    Akumulator punktacji jednego gatunku
+
+    Sloty zamiast zagnieżdżonego słownika na każde trafienie - mniejsza
+    presja na alokator i brak haszowania kluczy przy scalaniu.
+    """
+    __slots__ = ('total_score', 'sources', 'breakdown')
+
+    def __init__(self):
+        self.total_score = 0.0
+        self.sources = []
+        self.breakdown = {}
+
+    def as_dict(self) -> Dict:
+        """Postać słownikowa do analysis_details (API bez zmian)"""
+        return {
+            'total_score': self.total_score,
+            'sources': self.sources,
+            'breakdown': self.breakdown
+        }
+
+def _compile_pattern_unions(pattern_map: Dict[str, List[str]]) -> List[Tuple]:
+    """
+    Kompiluje po jednej unii alternatyw na gatunek
+
+    Numer dopasowanej grupy wskazuje, który wzorzec trafił, więc jedno
+    przejście silnika regex zastępuje re.search na każdy wzorzec z osobna.
+    Unie są per-gatunek, żeby wzorce różnych gatunków nakładające się w tym
+    samym miejscu (np. 'bass') nadal punktowały niezależnie.
+    """
+    return [
+        (genre, re.compile('|'.join(f'({p})' for p in patterns)), tuple(patterns))
+        for genre, patterns in pattern_map.items()
+    ]
+
 class GenreClassifier:
     """Klasa do klasyfikacji gatunków muzyki elektronicznej"""
-    
+
+    # Tabela kanonizacji tekstu - separatory traktowane jak spacje
+    _CANON_TABLE = str.maketrans('_-.', '   ')
+
+    @classmethod
+    def _canonical(cls, text: str) -> str:
+        """Kanoniczna postać tekstu: separatory _-. jako spacje, bez dubli"""
+        return _CANON_WS_RE.sub(' ', text.translate(cls._CANON_TABLE)).strip()
+
     def __init__(self):
         self.electronic_genres = ELECTRONIC_GENRES
         self.genre_keywords = GENRE_KEYWORDS
@@ -23,6 +298,43 @@ class GenreClassifier:
         
         # Rozszerzone mapowanie gatunków
         self.genre_mapping = self._build_genre_mapping()
+
+        # Odwrócony indeks podgatunków (małymi literami): jeden lookup
+        # zamiast budowania listy lowercase'ów przy każdym tagu
+        self._subgenre_to_main = {}
+        for main_genre, subgenres in self.electronic_genres.items():
+            for subgenre in subgenres:
+                self._subgenre_to_main.setdefault(subgenre.lower(), []).append(main_genre)
+
+        # Słowa kluczowe w postaci kanonicznej - tekst wyszukiwania
+        # przechodzi przez translację separatorów, więc wzorce z myślnikami
+        # ("laid-back", "lo-fi") muszą przejść przez nią tak samo
+        self._canon_keywords = {
+            genre: tuple(dict.fromkeys(self._canonical(k.lower()) for k in keywords))
+            for genre, keywords in self.genre_keywords.items()
+        }
+
+        # Automat słów kluczowych budowany raz - iter() znajduje wszystkie
+        # trafienia w jednym przejściu po search_text
+        self._kw_automaton = self._build_keyword_automaton()
+
+        # Automat aliasów gatunków - dopasowanie częściowe w O(|nazwa|)
+        # zamiast pętli po całej tabeli aliasów przy każdym wywołaniu
+        self._alias_automaton = None
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for alias, main_genre in self.genre_mapping.items():
+                automaton.add_word(alias, main_genre)
+            automaton.make_automaton()
+            self._alias_automaton = automaton
+
+        # Cache wyników _map_genre - te same tagi powtarzają się w całej
+        # bibliotece, a mapowanie jest stałe w obrębie instancji
+        self._map_cache = {}
+
+        # Prekompilowane unie wzorców nazw plików
+        self._fn_text_regexes = _compile_pattern_unions(_FILENAME_PATTERNS)
+        self._fn_numeric_regexes = _compile_pattern_unions(_NUMERIC_PATTERNS)
         
         # Wzorce BPM dla różnych gatunków
         self.bpm_ranges = {
@@ -36,6 +348,15 @@ class GenreClassifier:
             'dubstep': (140, 150),
             'breakbeat': (130, 150)
         }
+
+        # Zakresy BPM jako tablice NumPy - dopasowanie wszystkich gatunków
+        # dwiema operacjami wektorowymi zamiast pętli z gałęzią na gatunek
+        if np is not None:
+            self._bpm_genres = tuple(self.bpm_ranges)
+            self._bpm_mins = np.array([lo for lo, hi in self.bpm_ranges.values()], dtype=np.float64)
+            self._bpm_maxs = np.array([hi for lo, hi in self.bpm_ranges.values()], dtype=np.float64)
+            self._bpm_centers = (self._bpm_mins + self._bpm_maxs) / 2
+            self._bpm_halfspans = (self._bpm_maxs - self._bpm_mins) / 2
     
     def classify_track(self, metadata: Dict, web_info: Dict = None) -> Dict:
         """
@@ -48,6 +369,66 @@ class GenreClassifier:
         Returns:
             Słownik z wynikami klasyfikacji
         """
+        # Zbieranie wszystkich dostępnych informacji
+        all_info = self._gather_all_info(metadata, web_info)
+        return self._classify_gathered(all_info)
+
+    def classify_batch(self, metadatas: List[Dict], web_infos: List[Dict] = None) -> List[Dict]:
+        """
+        Klasyfikuje wiele utworów naraz
+
+        Informacje o wszystkich utworach zbierane są w jednym przebiegu,
+        a klasyfikacja korzysta ze struktur przygotowanych raz w __init__
+        (automaty, tablice BPM, prekompilowane regexy) - bez kosztu
+        konfiguracji na pojedyncze wywołanie.
+
+        Args:
+            metadatas: Lista metadanych utworów
+            web_infos: Równoległa lista informacji z internetu (opcjonalna)
+
+        Returns:
+            Lista wyników klasyfikacji w kolejności wejścia
+        """
+        if web_infos is None:
+            web_infos = (None,) * len(metadatas)
+
+        all_infos = [self._gather_all_info(m, w) for m, w in zip(metadatas, web_infos)]
+        return [self._classify_gathered(all_info) for all_info in all_infos]
+
+    def classify_batch_parallel(self, metadatas: List[Dict], web_infos: List[Dict] = None,
+                                workers: int = None) -> List[Dict]:
+        """
+        Klasyfikuje partię utworów równolegle na wielu rdzeniach
+
+        Analiza audio jest niezależna per utwór, więc partia dzielona jest
+        między procesy robocze (każdy buduje własny klasyfikator raz przez
+        initializer puli). Dla małych partii spada do classify_batch.
+
+        Args:
+            metadatas: Lista metadanych utworów
+            web_infos: Równoległa lista informacji z internetu (opcjonalna)
+            workers: Liczba procesów (domyślnie liczba rdzeni)
+
+        Returns:
+            Lista wyników klasyfikacji w kolejności wejścia
+        """
+        if web_infos is None:
+            web_infos = (None,) * len(metadatas)
+
+        items = list(zip(metadatas, web_infos))
+        if len(items) < 4:
+            return self.classify_batch(metadatas, web_infos)
+
+        workers = workers or os.cpu_count() or 4
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                return list(executor.map(_classify_one, items, chunksize=16))
+        except Exception as e:
+            logger.warning(f"Klasyfikacja równoległa nie powiodła się ({e}) - przechodzę na tryb sekwencyjny")
+            return self.classify_batch(metadatas, web_infos)
+
+    def _classify_gathered(self, all_info: Dict) -> Dict:
+        """Uruchamia wszystkie metody klasyfikacji na zebranych informacjach"""
         classification_result = {
             'primary_genre': 'unknown',
             'secondary_genres': [],
@@ -56,10 +437,7 @@ class GenreClassifier:
             'suggested_folder': 'Other',
             'analysis_details': {}
         }
-        
-        # Zbieranie wszystkich dostępnych informacji
-        all_info = self._gather_all_info(metadata, web_info)
-        
+
         # Różne metody klasyfikacji
         genre_scores = {}
         
@@ -79,9 +457,16 @@ class GenreClassifier:
         audio_scores = self._classify_by_audio_features(all_info)
         self._merge_scores(genre_scores, audio_scores, 'audio_features')
         
-        # 4b. Klasyfikacja na podstawie lokalnej analizy audio
-        local_audio_scores = self._classify_by_local_audio_analysis(all_info)
-        self._merge_scores(genre_scores, local_audio_scores, 'local_audio')
+        # 4b. Klasyfikacja na podstawie lokalnej analizy audio - pomijana,
+        # gdy AI lub web dały już pewny wynik (dekodowanie + FFT to
+        # zdecydowanie najdroższy etap całej klasyfikacji)
+        fast_confidence = max(
+            all_info.get('web_confidence', 0.0) or 0.0,
+            all_info.get('ai_confidence', 0.0) or 0.0
+        )
+        if fast_confidence < 0.85:
+            local_audio_scores = self._classify_by_local_audio_analysis(all_info)
+            self._merge_scores(genre_scores, local_audio_scores, 'local_audio')
         
         # 4c. Klasyfikacja na podstawie analizy AI
         ai_scores = self._classify_by_ai_analysis(all_info)
@@ -93,26 +478,28 @@ class GenreClassifier:
         
         # Obliczanie końcowych wyników
         if genre_scores:
-            # Sortowanie według wyniku
-            sorted_genres = sorted(genre_scores.items(), key=lambda x: x[1]['total_score'], reverse=True)
-            
-            primary_genre, primary_data = sorted_genres[0]
+            # Pełny ranking nie jest potrzebny - wynik używa tylko trzech
+            # najlepszych gatunków, więc wystarczy częściowa selekcja O(n)
+            top_genres = heapq.nlargest(3, genre_scores.items(),
+                                        key=lambda x: x[1].total_score)
+
+            primary_genre, primary_data = top_genres[0]
             classification_result['primary_genre'] = primary_genre
-            classification_result['confidence_score'] = primary_data['total_score']
-            classification_result['classification_sources'] = primary_data['sources']
-            
+            classification_result['confidence_score'] = primary_data.total_score
+            classification_result['classification_sources'] = primary_data.sources
+
             # Gatunki drugorzędne
-            secondary = [genre for genre, data in sorted_genres[1:3] 
-                        if data['total_score'] > 0.3]
+            secondary = [genre for genre, data in top_genres[1:]
+                        if data.total_score > 0.3]
             classification_result['secondary_genres'] = secondary
-            
+
             # Sugerowany folder
             classification_result['suggested_folder'] = self._get_folder_name(primary_genre)
-            
-            # Szczegóły analizy
+
+            # Szczegóły analizy (na zewnątrz nadal zwykłe słowniki)
             classification_result['analysis_details'] = {
-                'all_scores': {genre: data['total_score'] for genre, data in sorted_genres},
-                'score_breakdown': {genre: data for genre, data in sorted_genres[:3]}
+                'all_scores': {genre: data.total_score for genre, data in genre_scores.items()},
+                'score_breakdown': {genre: data.as_dict() for genre, data in top_genres}
             }
         
         return classification_result
@@ -172,13 +559,13 @@ class GenreClassifier:
                         all_info['remix_style'] = str(ai_data.get('remix_style')).lower().replace(' ', '_')
                 
                 # Informacje z różnych źródeł
-                for source in ['spotify', 'lastfm', 'web']:
+                for source, genres_key, tags_key, _ in _SOURCE_FIELDS:
                     if source in additional:
                         source_data = additional[source]
                         if source_data.get('genres'):
-                            all_info[f'{source}_genres'] = source_data['genres']
+                            all_info[genres_key] = source_data['genres']
                         if source_data.get('tags'):
-                            all_info[f'{source}_tags'] = source_data['tags']
+                            all_info[tags_key] = source_data['tags']
             
             # Użyj BPM z internetu jeśli nie ma w metadanych
             if not all_info.get('bpm') and web_info.get('bpm'):
@@ -186,88 +573,111 @@ class GenreClassifier:
             # Użyj BPM z AI jeśli nie ma w metadanych ani w web_info
             if not all_info.get('bpm') and all_info.get('ai_bpm'):
                 all_info['bpm'] = all_info['ai_bpm']
-        
+
+        # Wersje lowercase liczone raz - kolejne klasyfikatory czytają je
+        # bez ponownej alokacji nowych stringów
+        all_info['_search_text'] = ' '.join((
+            all_info['title'],
+            all_info['artist'],
+            all_info['album'],
+            all_info.get('genre', ''),
+            all_info.get('comment', ''),
+            ' '.join(all_info['tags'])
+        )).lower()
+        all_info['_lc_filename'] = all_info['filename'].lower()
+        all_info['_lc_file_path'] = all_info['file_path'].lower()
+
+        # Kanoniczna postać tekstu: separatory _-. zamienione na spacje,
+        # wielokrotne spacje zwinięte - wielowyrazowe słowa kluczowe
+        # ("deep house") trafiają wtedy także zapisy w stylu "deep_house"
+        all_info['_canon'] = self._canonical(all_info['_search_text'])
+
         return all_info
     
     def _classify_by_genre_tags(self, all_info: Dict) -> Dict:
         """Klasyfikacja na podstawie tagów gatunku z różnych źródeł"""
-        scores = {}
-        
-        # Zbierz gatunki z różnych źródeł
-        all_genres = []
-        
-        # Gatunki z metadanych
+        scores = defaultdict(_empty_entry)
+
         metadata_genres = all_info.get('genres', [])
         if isinstance(metadata_genres, str):
             metadata_genres = [metadata_genres]
-        all_genres.extend([(g, 'metadata', 0.9) for g in metadata_genres])
-        
-        # Gatunki z internetu
-        web_genres = all_info.get('web_genres', [])
-        all_genres.extend([(g, 'web', 0.7) for g in web_genres])
-        
-        # Gatunki z różnych źródeł internetowych
-        for source in ['spotify', 'lastfm', 'web']:
-            source_genres = all_info.get(f'{source}_genres', [])
-            weight = {'spotify': 0.8, 'lastfm': 0.6, 'web': 0.5}.get(source, 0.5)
-            all_genres.extend([(g, source, weight) for g in source_genres])
-        
+
+        # Gatunki ze wszystkich źródeł jako jeden leniwy łańcuch
+        # zamiast trzech list budowanych przez .extend
+        all_genres = chain(
+            ((g, 'metadata', 0.9) for g in metadata_genres),
+            ((g, 'web', 0.7) for g in all_info.get('web_genres', [])),
+            ((g, source, weight)
+             for source, genres_key, _, weight in _SOURCE_FIELDS
+             for g in all_info.get(genres_key, []))
+        )
+
         # Przetwarzaj wszystkie gatunki
         for genre, source, weight in all_genres:
             if not genre:
                 continue
-                
+
             genre_lower = genre.lower()
-            
-            # Bezpośrednie dopasowanie
-            for main_genre, subgenres in self.electronic_genres.items():
-                if genre_lower in [sg.lower() for sg in subgenres]:
-                    if main_genre not in scores:
-                        scores[main_genre] = {'score': 0, 'sources': []}
-                    scores[main_genre]['score'] += weight
-                    scores[main_genre]['sources'].append(f"direct_match_{source}:{genre}")
-            
+
+            # Bezpośrednie dopasowanie - odwrócony indeks zamiast pętli
+            # po wszystkich gatunkach z lowercase'owaniem podgatunków
+            for main_genre in self._subgenre_to_main.get(genre_lower, ()):
+                entry = scores[main_genre]
+                entry['score'] += weight
+                entry['sources'].append(f"direct_match_{source}:{genre}")
+
             # Dopasowanie przez mapowanie
             mapped_genre = self._map_genre(genre_lower)
             if mapped_genre:
-                if mapped_genre not in scores:
-                    scores[mapped_genre] = {'score': 0, 'sources': []}
-                scores[mapped_genre]['score'] += weight * 0.8
-                scores[mapped_genre]['sources'].append(f"mapped_{source}:{genre}")
-        
+                entry = scores[mapped_genre]
+                entry['score'] += weight * 0.8
+                entry['sources'].append(f"mapped_{source}:{genre}")
+
         return scores
     
     def _classify_by_keywords(self, all_info: Dict) -> Dict:
         """Klasyfikacja na podstawie słów kluczowych"""
         scores = {}
-        
-        # Tekst do analizy
-        text_fields = [
-            all_info.get('title', ''),
-            all_info.get('artist', ''),
-            all_info.get('album', ''),
-            all_info.get('genre', ''),
-            all_info.get('comment', ''),
-            ' '.join(all_info.get('tags', []))
-        ]
-        
-        search_text = ' '.join(text_fields).lower()
-        
-        for genre, keywords in self.genre_keywords.items():
+
+        # Tekst do analizy - kanoniczna postać policzona raz w _gather_all_info
+        # (lowercase, separatory _-. jako spacje)
+        search_text = all_info.get('_canon')
+        if search_text is None:
+            text_fields = [all_info.get(key, '') for key in _TEXT_FIELD_KEYS]
+            text_fields.append(' '.join(all_info.get('tags', [])))
+            search_text = self._canonical(' '.join(text_fields).lower())
+
+        if self._kw_automaton is not None:
+            # Jedno liniowe przejście po tekście zamiast skanu na słowo kluczowe;
+            # zbiory deduplikują wielokrotne wystąpienia tak jak test "in"
+            found = {}
+            for _, (keyword, genres) in self._kw_automaton.iter(search_text):
+                for genre in genres:
+                    found.setdefault(genre, set()).add(keyword)
+
+            for genre, keywords in found.items():
+                scores[genre] = {
+                    'score': min(0.3 * len(keywords), 1.0),
+                    'sources': [f"keywords:{','.join(sorted(keywords))}"]
+                }
+            return scores
+
+        # Fallback bez pyahocorasick - dotychczasowy skan podciągów
+        for genre, keywords in self._canon_keywords.items():
             genre_score = 0
             found_keywords = []
-            
+
             for keyword in keywords:
                 if keyword in search_text:
                     genre_score += 0.3
                     found_keywords.append(keyword)
-            
+
             if genre_score > 0:
                 scores[genre] = {
                     'score': min(genre_score, 1.0),
                     'sources': [f"keywords:{','.join(found_keywords)}"]
                 }
-        
+
         return scores
     
     def _classify_by_bpm(self, bpm_str: str) -> Dict:
@@ -278,7 +688,18 @@ class GenreClassifier:
             bpm = float(bpm_str) if bpm_str else 0
             if bpm == 0:
                 return scores
-                
+
+            if np is not None:
+                mask = (self._bpm_mins <= bpm) & (bpm <= self._bpm_maxs)
+                if mask.any():
+                    score_arr = (1.0 - np.abs(bpm - self._bpm_centers) / self._bpm_halfspans) * 0.6
+                    for idx in np.nonzero(mask)[0]:
+                        scores[self._bpm_genres[idx]] = {
+                            'score': float(score_arr[idx]),
+                            'sources': [f"bpm:{bpm}"]
+                        }
+                return scores
+
             for genre, (min_bpm, max_bpm) in self.bpm_ranges.items():
                 if min_bpm <= bpm <= max_bpm:
                     # Im bliżej środka zakresu, tym wyższy wynik
@@ -327,7 +748,7 @@ class GenreClassifier:
     
     def _classify_by_local_audio_analysis(self, all_info: Dict) -> Dict:
         """Klasyfikacja na podstawie lokalnej analizy audio"""
-        scores = {}
+        scores = defaultdict(_empty_entry)
         
         try:
             file_path = all_info.get('file_path', '')
@@ -337,33 +758,20 @@ class GenreClassifier:
             # Próba importu librosa dla analizy audio
             try:
                 import librosa
-                import numpy as np
             except ImportError:
                 logger.warning("Librosa nie jest zainstalowana - pomijam analizę audio")
                 return scores
-            
-            # Ładowanie audio (pierwsze 30 sekund dla szybkości)
+
+            # Cechy liczone raz na (ścieżka, mtime) - dekodowanie i FFT
+            # nie powtarzają się przy ponownej klasyfikacji tego samego pliku
             try:
-                y, sr = librosa.load(file_path, duration=30, sr=22050)
+                mtime = os.path.getmtime(file_path)
+                tempo, avg_spectral_centroid, avg_spectral_rolloff, avg_zcr = \
+                    _extract_audio_features(file_path, mtime)
             except Exception as e:
                 logger.warning(f"Nie można załadować pliku audio {file_path}: {e}")
                 return scores
             
-            # Analiza tempa
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-            # Konwersja numpy array na float
-            tempo = float(tempo) if hasattr(tempo, 'item') else float(tempo)
-            
-            # Analiza spektralnych cech
-            spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
-            zero_crossing_rate = librosa.feature.zero_crossing_rate(y)[0]
-            
-            # Obliczanie średnich
-            avg_spectral_centroid = float(np.mean(spectral_centroids))
-            avg_spectral_rolloff = float(np.mean(spectral_rolloff))
-            avg_zcr = float(np.mean(zero_crossing_rate))
-            
             # Klasyfikacja na podstawie tempa
             if tempo < 90:
                 scores['ambient'] = {'score': 0.3, 'sources': [f'slow_tempo:{tempo:.1f}']}
@@ -381,24 +789,21 @@ class GenreClassifier:
             # Klasyfikacja na podstawie spektralnych cech
             if avg_spectral_centroid < 1000:
                 # Niskie częstotliwości dominują
-                if 'ambient' not in scores:
-                    scores['ambient'] = {'score': 0, 'sources': []}
-                scores['ambient']['score'] += 0.2
-                scores['ambient']['sources'].append('low_frequencies')
+                entry = scores['ambient']
+                entry['score'] += 0.2
+                entry['sources'].append('low_frequencies')
             elif avg_spectral_centroid > 3000:
                 # Wysokie częstotliwości dominują
-                if 'techno' not in scores:
-                    scores['techno'] = {'score': 0, 'sources': []}
-                scores['techno']['score'] += 0.2
-                scores['techno']['sources'].append('high_frequencies')
+                entry = scores['techno']
+                entry['score'] += 0.2
+                entry['sources'].append('high_frequencies')
             
             # Analiza dynamiki (zero crossing rate)
             if avg_zcr > 0.1:
                 # Wysoka dynamika = energetyczna muzyka
-                if 'electronic' not in scores:
-                    scores['electronic'] = {'score': 0, 'sources': []}
-                scores['electronic']['score'] += 0.15
-                scores['electronic']['sources'].append('high_dynamics')
+                entry = scores['electronic']
+                entry['score'] += 0.15
+                entry['sources'].append('high_dynamics')
             
         except Exception as e:
             logger.warning(f"Błąd podczas analizy audio: {e}")
@@ -407,156 +812,146 @@ class GenreClassifier:
     
     def _classify_by_ai_analysis(self, all_info: Dict) -> Dict:
         """Klasyfikacja na podstawie analizy AI"""
-        scores = {}
-        
+        scores = defaultdict(_empty_entry)
+
         # Sprawdź czy mamy wyniki analizy AI
         ai_genre = all_info.get('ai_genre')
         ai_confidence = all_info.get('ai_confidence', 0.0)
         ai_tags = all_info.get('ai_tags', [])
         
         if ai_genre and ai_confidence > 0.3:
-            # Główny gatunek z AI
-            if ai_genre not in scores:
-                scores[ai_genre] = {'score': 0, 'sources': []}
-            
-            # Wysokie zaufanie do analizy AI
-            scores[ai_genre]['score'] += ai_confidence * 1.2  # Boost dla AI
-            scores[ai_genre]['sources'].append(f"ai_primary:{ai_confidence:.2f}")
-            
+            # Główny gatunek z AI - wysokie zaufanie do analizy
+            entry = scores[ai_genre]
+            entry['score'] += ai_confidence * 1.2  # Boost dla AI
+            entry['sources'].append(f"ai_primary:{ai_confidence:.2f}")
+
             # Dodaj punkty za tagi AI
             for tag in ai_tags:
-                tag_lower = tag.lower()
-                mapped_genre = self._map_genre(tag_lower)
+                mapped_genre = self._map_genre(tag.lower())
                 if mapped_genre:
-                    if mapped_genre not in scores:
-                        scores[mapped_genre] = {'score': 0, 'sources': []}
-                    scores[mapped_genre]['score'] += 0.3
-                    scores[mapped_genre]['sources'].append(f"ai_tag:{tag}")
+                    entry = scores[mapped_genre]
+                    entry['score'] += 0.3
+                    entry['sources'].append(f"ai_tag:{tag}")
 
         # Jeśli to remiks, preferuj styl remiksu nad oryginał
         if all_info.get('is_remix'):
             remix_style = all_info.get('remix_style')
             if remix_style:
                 mapped_remix = self._map_genre(remix_style)
-                target_genre = mapped_remix or remix_style
-                if target_genre not in scores:
-                    scores[target_genre] = {'score': 0, 'sources': []}
-                scores[target_genre]['score'] += 0.8
-                scores[target_genre]['sources'].append('ai_remix_style')
+                entry = scores[mapped_remix or remix_style]
+                entry['score'] += 0.8
+                entry['sources'].append('ai_remix_style')
         
         # Sprawdź informacje z web primary genre
         web_primary = all_info.get('web_primary_genre')
         web_confidence = all_info.get('web_confidence', 0.0)
         
         if web_primary and web_confidence > 0.4:
-            if web_primary not in scores:
-                scores[web_primary] = {'score': 0, 'sources': []}
-            scores[web_primary]['score'] += web_confidence
-            scores[web_primary]['sources'].append(f"web_primary:{web_confidence:.2f}")
+            entry = scores[web_primary]
+            entry['score'] += web_confidence
+            entry['sources'].append(f"web_primary:{web_confidence:.2f}")
         
         # Sprawdź secondary genre
         web_secondary = all_info.get('web_secondary_genre')
         if web_secondary:
-            if web_secondary not in scores:
-                scores[web_secondary] = {'score': 0, 'sources': []}
-            scores[web_secondary]['score'] += 0.4
-            scores[web_secondary]['sources'].append("web_secondary")
+            entry = scores[web_secondary]
+            entry['score'] += 0.4
+            entry['sources'].append("web_secondary")
         
         return scores
     
     def _classify_by_filename(self, all_info: Dict) -> Dict:
         """Klasyfikacja na podstawie nazwy pliku i ścieżki"""
-        scores = {}
+        scores = defaultdict(_empty_entry)
         
-        filename = all_info.get('filename', '').lower()
-        file_path = all_info.get('file_path', '').lower()
+        filename = all_info.get('_lc_filename')
+        if filename is None:
+            filename = all_info.get('filename', '').lower()
+        file_path = all_info.get('_lc_file_path')
+        if file_path is None:
+            file_path = all_info.get('file_path', '').lower()
         
         # Sprawdzanie ścieżki pliku
         for genre in self.electronic_genres.keys():
             if genre in file_path or genre in filename:
-                scores[genre] = {'score': 0.4, 'sources': [f"path_contains:{genre}"]}
-        
-        # Rozszerzone wzorce dla różnych gatunków
-        patterns = {
-            'ambient': [r'amb', r'drone', r'atmospheric', r'space', r'calm', r'meditation', 
-                       r'peaceful', r'relax', r'chill', r'soft', r'quiet', r'gentle'],
-            'techno': [r'tech', r'minimal', r'detroit', r'hard', r'driving', r'industrial',
-                      r'machine', r'robot', r'cyber', r'digital', r'electronic'],
-            'house': [r'house', r'deep', r'funky', r'groove', r'disco', r'dance',
-                     r'club', r'party', r'beat', r'rhythm'],
-            'trance': [r'trance', r'uplifting', r'progressive', r'epic', r'emotional',
-                      r'euphoric', r'energy', r'psych', r'goa'],
-            'dubstep': [r'dub', r'bass', r'wobble', r'drop', r'heavy', r'aggressive',
-                       r'distorted', r'glitch', r'step'],
-            # Industrial (ogólne)
-            'industrial': [r'industrial', r'ebm', r'dark', r'metal', r'noise', r'distortion', r'aggressive', r'mechanical'],
-            # Podgatunki Industrial Ambient
-            'ambient_industrial': [r'ambient\s*industrial', r'industrial\s*ambient'],
-            'death_industrial': [r'death\s*industrial'],
-            'power_noise': [r'power\s*noise', r'rhythmic\s*noise', r'power\s*electronics', r'harsh\s*noise'],
-            'drum_and_bass': [r'dnb', r'drum', r'bass', r'jungle', r'breakbeat', r'liquid',
-                             r'neurofunk', r'jump', r'break'],
-            'synthwave': [r'synth', r'retro', r'80s', r'neon', r'cyber', r'outrun',
-                         r'vaporwave', r'nostalgic', r'vintage'],
-            'experimental': [r'experimental', r'weird', r'strange', r'abstract', r'avant',
-                           r'unconventional', r'unique', r'odd', r'unusual']
-        }
-        
-        # Wzorce numeryczne i strukturalne
-        numeric_patterns = {
-            'minimal': [r'^\d+$', r'^\d+[a-z]?$'],  # Same liczby jak "925"
-            'experimental': [r'[_\-]{2,}', r'[a-z]+_[a-z]+_[a-z]+'],  # Wiele podkreśleń
-            'ambient': [r'long', r'extended', r'part\d+', r'chapter'],
-            'techno': [r'mix\d+', r'set\d+', r'track\d+']
-        }
-        
-        # Sprawdzanie wzorców tekstowych
-        for genre, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                if re.search(pattern, filename):
-                    if genre not in scores:
-                        scores[genre] = {'score': 0, 'sources': []}
-                    scores[genre]['score'] += 0.15
-                    scores[genre]['sources'].append(f"filename_pattern:{pattern}")
+                entry = scores[genre]
+                entry['score'] += 0.4
+                entry['sources'].append(f"path_contains:{genre}")
         
+        # Sprawdzanie wzorców tekstowych - jedna unia na gatunek,
+        # zbiór numerów grup deduplikuje wielokrotne trafienia wzorca
+        for genre, regex, patterns in self._fn_text_regexes:
+            matched = {m.lastindex for m in regex.finditer(filename)}
+            if matched:
+                entry = scores[genre]
+                entry['score'] += 0.15 * len(matched)
+                entry['sources'].extend(
+                    f"filename_pattern:{patterns[i - 1]}" for i in sorted(matched)
+                )
+
         # Sprawdzanie wzorców numerycznych i strukturalnych
-        for genre, pattern_list in numeric_patterns.items():
-            for pattern in pattern_list:
-                if re.search(pattern, filename):
-                    if genre not in scores:
-                        scores[genre] = {'score': 0, 'sources': []}
-                    scores[genre]['score'] += 0.1
-                    scores[genre]['sources'].append(f"structure_pattern:{pattern}")
+        for genre, regex, patterns in self._fn_numeric_regexes:
+            matched = {m.lastindex for m in regex.finditer(filename)}
+            if matched:
+                entry = scores[genre]
+                entry['score'] += 0.1 * len(matched)
+                entry['sources'].extend(
+                    f"structure_pattern:{patterns[i - 1]}" for i in sorted(matched)
+                )
         
         # Analiza długości nazwy pliku (heurystyka)
         if len(filename) < 10:  # Krótkie nazwy często to minimal/experimental
-            for genre in ['minimal', 'experimental']:
-                if genre not in scores:
-                    scores[genre] = {'score': 0.05, 'sources': ['short_filename']}
-                else:
-                    scores[genre]['score'] += 0.05
+            for genre in ('minimal', 'experimental'):
+                first_hit = genre not in scores
+                entry = scores[genre]
+                entry['score'] += 0.05
+                if first_hit:
+                    entry['sources'].append('short_filename')
         
         # Analiza separatorów
         if '_' in filename:
             separator_count = filename.count('_')
             if separator_count >= 3:  # Wiele separatorów = experimental
-                if 'experimental' not in scores:
-                    scores['experimental'] = {'score': 0.1, 'sources': ['many_separators']}
-                else:
-                    scores['experimental']['score'] += 0.1
+                first_hit = 'experimental' not in scores
+                entry = scores['experimental']
+                entry['score'] += 0.1
+                if first_hit:
+                    entry['sources'].append('many_separators')
         
         return scores
     
     def _merge_scores(self, main_scores: Dict, new_scores: Dict, source_type: str):
         """Łączy wyniki z różnych metod klasyfikacji"""
         for genre, data in new_scores.items():
-            if genre not in main_scores:
-                main_scores[genre] = {'total_score': 0, 'sources': [], 'breakdown': {}}
-            
-            main_scores[genre]['total_score'] += data['score']
-            main_scores[genre]['sources'].extend(data['sources'])
-            main_scores[genre]['breakdown'][source_type] = data['score']
+            entry = main_scores.get(genre)
+            if entry is None:
+                entry = main_scores[genre] = _GenreScore()
+
+            entry.total_score += data['score']
+            entry.sources.extend(data['sources'])
+            entry.breakdown[source_type] = data['score']
     
+    def _build_keyword_automaton(self):
+        """
+        Buduje automat Aho-Corasicka nad wszystkimi słowami kluczowymi
+
+        To samo słowo może wskazywać kilka gatunków, więc ładunkiem węzła
+        jest (słowo, krotka gatunków). Zwraca None gdy brak pyahocorasick.
+        """
+        if ahocorasick is None:
+            return None
+
+        keyword_genres = {}
+        for genre, keywords in self._canon_keywords.items():
+            for keyword in keywords:
+                keyword_genres.setdefault(keyword, []).append(genre)
+
+        automaton = ahocorasick.Automaton()
+        for keyword, genres in keyword_genres.items():
+            automaton.add_word(keyword, (keyword, tuple(genres)))
+        automaton.make_automaton()
+        return automaton
+
     def _build_genre_mapping(self) -> Dict:
         """Buduje mapowanie różnych nazw gatunków na główne kategorie"""
         mapping = {}
@@ -587,23 +982,44 @@ class GenreClassifier:
     def _map_genre(self, genre: str) -> Optional[str]:
         """Mapuje gatunek na główną kategorię"""
         genre_lower = genre.lower()
-        
+
         # Bezpośrednie mapowanie
         if genre_lower in self.genre_mapping:
             return self.genre_mapping[genre_lower]
-        
-        # Częściowe dopasowanie
+
+        # Dopasowanie częściowe jest droższe - wynik zapamiętujemy,
+        # bo te same nazwy tagów wracają przy kolejnych utworach
+        if genre_lower in self._map_cache:
+            return self._map_cache[genre_lower]
+        mapped = self._map_genre_uncached(genre_lower)
+        self._map_cache[genre_lower] = mapped
+        return mapped
+
+    def _map_genre_uncached(self, genre_lower: str) -> Optional[str]:
+        """Dopasowanie częściowe nazwy gatunku (wolna ścieżka _map_genre)"""
+        if self._alias_automaton is not None:
+            # Kierunek "alias zawarty w nazwie" - jedno przejście automatu
+            for _, main_genre in self._alias_automaton.iter(genre_lower):
+                return main_genre
+            # Kierunek odwrotny ("nazwa zawarta w aliasie") - rzadki,
+            # sprawdzany dopiero gdy automat nic nie znalazł
+            for mapped_genre, main_genre in self.genre_mapping.items():
+                if genre_lower in mapped_genre:
+                    return main_genre
+            return None
+
+        # Częściowe dopasowanie bez pyahocorasick
         for mapped_genre, main_genre in self.genre_mapping.items():
             if mapped_genre in genre_lower or genre_lower in mapped_genre:
                 return main_genre
-        
+
         return None
     
     def _get_folder_name(self, genre: str) -> str:
         """Zwraca nazwę folderu dla gatunku korzystając z konfiguracji"""
         try:
-            # Użyj centralnego mapowania z config, które zawiera podgatunki
-            from config import get_genre_folder_name
+            # Centralne mapowanie z config (zawiera podgatunki); funkcja
+            # jest tam cache'owana przez lru_cache, więc wywołanie jest tanie
             return get_genre_folder_name(genre)
         except Exception:
             # Awaryjnie zwróć tytułową nazwę gatunku zamiast "Other Electronic"
@@ -614,22 +1030,34 @@ class GenreClassifier:
         if not classifications:
             return {}
         
-        genre_counts = Counter()
-        confidence_scores = []
-        
-        for classification in classifications:
-            genre = classification.get('primary_genre', 'unknown')
-            confidence = classification.get('confidence_score', 0)
-            
-            genre_counts[genre] += 1
-            confidence_scores.append(confidence)
-        
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
-        
+        genre_counts = Counter(
+            c.get('primary_genre', 'unknown') for c in classifications
+        )
+
+        if np is not None:
+            # Progi i średnia z jednej tablicy pewności; z Numbą wszystkie
+            # trzy redukcje zlewają się w jedno przejście po danych
+            confs = np.fromiter(
+                (c.get('confidence_score', 0) for c in classifications),
+                dtype=np.float64, count=len(classifications)
+            )
+            if njit is not None:
+                total, high, low = _conf_stats(confs)
+                avg_confidence = total / confs.size
+            else:
+                avg_confidence = float(confs.mean())
+                high = int((confs > 0.7).sum())
+                low = int((confs < 0.3).sum())
+        else:
+            confidence_scores = [c.get('confidence_score', 0) for c in classifications]
+            avg_confidence = sum(confidence_scores) / len(confidence_scores)
+            high = sum(1 for s in confidence_scores if s > 0.7)
+            low = sum(1 for s in confidence_scores if s < 0.3)
+
         return {
             'total_tracks': len(classifications),
             'genre_distribution': dict(genre_counts),
             'average_confidence': round(avg_confidence, 2),
-            'high_confidence_tracks': len([s for s in confidence_scores if s > 0.7]),
-            'low_confidence_tracks': len([s for s in confidence_scores if s < 0.3])
+            'high_confidence_tracks': high,
+            'low_confidence_tracks': low
         }
\ No newline at end of file
@@ -4,19 +4,52 @@ Interfejs graficzny dla Music Genre Sorter
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext, colorchooser
-import re
 import threading
 import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import json
 from datetime import datetime
 import os
 
-from metadata_analyzer import MetadataAnalyzer
-from web_searcher import WebSearcher
-from genre_classifier import GenreClassifier
-from file_organizer import FileOrganizer
-from config import WINDOW_SIZE, THEME, DEFAULT_MUSIC_DIR, DEFAULT_OUTPUT_DIR
+import csv
+import random
+import shelve
+
+from config import (WINDOW_SIZE, THEME, DEFAULT_MUSIC_DIR, DEFAULT_OUTPUT_DIR,
+                    ELECTRONIC_GENRES, get_genre_folder_name)
+
+# Ciężkie komponenty (mutagen, requests, openai, numpy...) importowane są
+# leniwie w akcesorach _get_* - okno pojawia się bez czekania na ich import
+
+# Tabele stylów motywów - jedna pętla configure zamiast kilkunastu
+# powtarzanych wywołań marshallowanych osobno do Tcl
+_DARK_STYLES = {
+    "TLabel": {"background": "#2b2b2b", "foreground": "#ffffff"},
+    "TFrame": {"background": "#2b2b2b"},
+    "TLabelFrame": {"background": "#2b2b2b", "foreground": "#ffffff"},
+    "TButton": {"background": "#3a3a3a", "foreground": "#ffffff"},
+    "Horizontal.TProgressbar": {"background": "#5c9ded"},
+    "Treeview": {"background": "#2b2b2b", "foreground": "#ffffff", "fieldbackground": "#2b2b2b"},
+    "Treeview.Heading": {"background": "#3a3a3a", "foreground": "#ffffff"},
+    "TNotebook": {"background": "#2b2b2b"},
+    "TNotebook.Tab": {"background": "#3a3a3a", "foreground": "#ffffff"},
+    "TCheckbutton": {"background": "#2b2b2b", "foreground": "#ffffff"},
+    "TRadiobutton": {"background": "#2b2b2b", "foreground": "#ffffff"},
+    "TEntry": {"fieldbackground": "#1f1f1f", "foreground": "#ffffff"},
+}
+
+# Palety klasycznych widgetów Tk (Text/ScrolledText), których ttk.Style
+# nie obejmuje - jedno źródło kolorów zamiast literałów przy każdym configure
+_DARK_TEXT = {"bg": "#1f1f1f", "fg": "#eaeaea", "insertbackground": "#eaeaea"}
+_LIGHT_TEXT = {"bg": "#ffffff", "fg": "#000000", "insertbackground": "#000000"}
+
+_LIGHT_STYLES = {
+    "TLabel": {"background": "#f0f0f0", "foreground": "#000000"},
+    "TFrame": {"background": "#f0f0f0"},
+    "TLabelFrame": {"background": "#f0f0f0", "foreground": "#000000"},
+    "TButton": {"background": "#e0e0e0", "foreground": "#000000"},
+}
 
 class MusicGenreSorterGUI:
     """Główna klasa interfejsu graficznego"""
@@ -25,45 +58,118 @@ class MusicGenreSorterGUI:
         self.root = tk.Tk()
         self.root.title("Music Genre Sorter - Sortowanie muzyki elektronicznej")
         self.root.geometry(WINDOW_SIZE)
+
+        # Jedna współdzielona instancja stylu ttk dla całej aplikacji
+        self._style = ttk.Style()
         
-        # Komponenty aplikacji
-        self.metadata_analyzer = MetadataAnalyzer()
-        # Wczytaj zapisane klucze API do zmiennych środowiskowych zanim zainicjalizujemy integracje
+        # Cache sparsowanych plików JSON ustawień: path -> (mtime_ns, dane)
+        self._json_cache = {}
+
+        # Komponenty aplikacji - tworzone na żądanie przez akcesory _get_*
+        self.metadata_analyzer = None
+        self.web_searcher = None
+        self.genre_classifier = None
+        self.file_organizer = None
+        # Wczytaj zapisane klucze API do zmiennych środowiskowych zanim
+        # którakolwiek integracja zostanie zainicjalizowana
         self._load_saved_api_keys()
-        self.web_searcher = WebSearcher()
-        self.genre_classifier = GenreClassifier()
-        self.file_organizer = FileOrganizer()
         
         # Zmienne
+        self._last_browse_dir = None  # ostatni katalog wybrany w dialogu
         self.source_dir = tk.StringVar(value=str(DEFAULT_MUSIC_DIR))
         self.output_dir = tk.StringVar(value=str(DEFAULT_OUTPUT_DIR))
         self.recursive_scan = tk.BooleanVar(value=True)
         self.use_web_search = tk.BooleanVar(value=True)
         self.dry_run = tk.BooleanVar(value=False)
         self.min_confidence = tk.DoubleVar(value=0.5)
+        # Tekst etykiety suwaka pewności aktualizowany z opóźnieniem
+        self.min_confidence_label = tk.StringVar(value="0.50")
+        self._conf_job = None
         
         # Dane
         self.music_files = []
         self.classifications = []
         self.current_analysis = None
+        # Metadane odczytane równolegle podczas skanowania - analiza
+        # korzysta z nich zamiast ponownie parsować tagi
+        self._scanned_metadata = {}
+        # Indeks wiersz drzewa wyników -> klasyfikacja (O(1) zamiast skanu)
+        self._item_to_classification = {}
+        # Cache wyników webowych na (artysta, tytuł) - przy ripach albumów
+        # i duplikatach oszczędza powtórne okrążenia sieci
+        self._web_cache_lock = threading.Lock()
+        self._search_cache = {}
+        self._enhance_cache = {}
+        # Trwały cache odpowiedzi webowych między uruchomieniami - ponowna
+        # analiza tej samej biblioteki nie płaci drugi raz za sieć i tokeny
+        # (jak scan_cache.db w analizatorze metadanych)
+        try:
+            self._web_disk_cache = shelve.open('web_cache.db')
+        except Exception:
+            self._web_disk_cache = None
+        self._web_cache_writes = 0
+        # Cache gatunek -> nazwa folderu (zapełniany przy pierwszym użyciu)
+        self._folder_name_cache = {}
+        # Bufor linii logu spłukiwany porcjami do widgetu
+        self._log_lock = threading.Lock()
+        self._log_buffer = []
+        self._log_flush_job = None
+        # Kolumny SoA dla gorących pól klasyfikacji - przeglądy (filtr
+        # sortowania) działają na płaskich listach zamiast po słownikach
+        self._conf_col = []
+        self._folder_col = []
         
         # Queue dla komunikacji z wątkami
-        self.progress_queue = queue.Queue()
+        # Ograniczona kolejka - rozpędzony worker nie może zapełnić pamięci
+        # komunikatami szybciej, niż tyka pętla _check_progress
+        self.progress_queue = queue.Queue(maxsize=1024)
+        # Ostatnio ustawione wartości postępu/statusu (deduplikacja w _check_progress)
+        self._last_progress = None
+        self._last_status = None
 
-        # Bufor uzasadnień AI i rotacja co 30s
+        # Bufor uzasadnień AI i rotacja co 30s - jedna pętla after()
+        # obsługuje cały panel, bez równoległych zadań animacji
         self.ai_reasons_cache = []  # list[str]
+        self._ai_reasons_seen = set()  # sidecar do deduplikacji O(1)
         self._current_ai_text = ""
         self._rotation_job = None
-        # Identyfikatory animacji
-        self._fade_in_job = None
-        self._fade_out_job = None
-        self._swap_job = None
+        self._rotation_order = []  # przetasowane indeksy bufora uzasadnień
+        self._rotation_cursor = 0
         
         self.setup_ui()
         self.setup_styles()
-        
-        # Sprawdź status ChatGPT po utworzeniu UI
-        self.check_chatgpt_status()
+
+        # Sprawdź status ChatGPT dopiero gdy okno jest już narysowane -
+        # to wywołanie tworzy WebSearchera (import requests/openai)
+        self.root.after(500, self.check_chatgpt_status)
+
+    def _get_metadata_analyzer(self):
+        """Leniwie tworzy analizator metadanych (import mutagen/eyed3)"""
+        if self.metadata_analyzer is None:
+            from metadata_analyzer import MetadataAnalyzer
+            self.metadata_analyzer = MetadataAnalyzer()
+        return self.metadata_analyzer
+
+    def _get_web_searcher(self):
+        """Leniwie tworzy wyszukiwarkę internetową (import requests/openai)"""
+        if self.web_searcher is None:
+            from web_searcher import WebSearcher
+            self.web_searcher = WebSearcher()
+        return self.web_searcher
+
+    def _get_genre_classifier(self):
+        """Leniwie tworzy klasyfikator gatunków"""
+        if self.genre_classifier is None:
+            from genre_classifier import GenreClassifier
+            self.genre_classifier = GenreClassifier()
+        return self.genre_classifier
+
+    def _get_file_organizer(self):
+        """Leniwie tworzy organizator plików"""
+        if self.file_organizer is None:
+            from file_organizer import FileOrganizer
+            self.file_organizer = FileOrganizer()
+        return self.file_organizer
         
     def setup_ui(self):
         """Konfiguruje interfejs użytkownika"""
@@ -123,9 +229,10 @@ class MusicGenreSorterGUI:
         conf_frame = ttk.Frame(options_frame)
         conf_frame.pack(fill=tk.X, pady=(5, 0))
         ttk.Label(conf_frame, text="Minimalny poziom pewności:").pack(side=tk.LEFT)
-        ttk.Scale(conf_frame, from_=0.0, to=1.0, variable=self.min_confidence, 
-                 orient=tk.HORIZONTAL, length=200).pack(side=tk.LEFT, padx=(10, 5))
-        ttk.Label(conf_frame, textvariable=self.min_confidence).pack(side=tk.LEFT)
+        ttk.Scale(conf_frame, from_=0.0, to=1.0, value=self.min_confidence.get(),
+                 orient=tk.HORIZONTAL, length=200,
+                 command=self._on_conf_change).pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Label(conf_frame, textvariable=self.min_confidence_label).pack(side=tk.LEFT)
         
         # Przyciski akcji
         buttons_frame = ttk.Frame(main_frame)
@@ -148,12 +255,21 @@ class MusicGenreSorterGUI:
         self.status_var = tk.StringVar(value="Gotowy do pracy")
         ttk.Label(main_frame, textvariable=self.status_var).pack(anchor=tk.W)
 
-        # Panel uzasadnienia AI – wielowierszowy (3 linie), pełny opis
+        # Panel uzasadnienia AI – pojedyncza etykieta z zawijaniem; Label jest
+        # o rząd lżejszy niż Text (brak bufora tagów/undo), a aktualizacja to
+        # jedno ustawienie StringVar zamiast delete/insert/configure
         self.ai_panel_frame = ttk.LabelFrame(main_frame, text="Analiza AI – uzasadnienie klasyfikacji", padding=6)
         self.ai_panel_frame.pack(fill=tk.X, pady=(5, 10))
-        self.ai_reason_label = tk.Text(self.ai_panel_frame, height=3, wrap=tk.WORD)
-        self.ai_reason_label.configure(state=tk.DISABLED, relief=tk.FLAT, bg="#ffffff", fg="#000000", insertbackground="#000000")
+        self._style.configure("AIReason.TLabel", background="#ffffff", foreground="#000000")
+        self._ai_reason_var = tk.StringVar()
+        self.ai_reason_label = ttk.Label(self.ai_panel_frame, textvariable=self._ai_reason_var,
+                                         style="AIReason.TLabel", wraplength=700,
+                                         justify=tk.LEFT, anchor=tk.W)
         self.ai_reason_label.pack(fill=tk.X)
+        # Zawijanie podąża za bieżącą szerokością panelu
+        self.ai_panel_frame.bind(
+            '<Configure>',
+            lambda e: self.ai_reason_label.configure(wraplength=max(e.width - 20, 100)))
         
     def setup_settings_tab(self):
         """Konfiguruje zakładkę ustawień"""
@@ -240,7 +356,7 @@ class MusicGenreSorterGUI:
         self.stats_text.pack(fill=tk.X)
         try:
             if THEME == "dark":
-                self.stats_text.configure(bg="#1f1f1f", fg="#eaeaea", insertbackground="#eaeaea")
+                self.stats_text.configure(**_DARK_TEXT)
         except Exception:
             pass
         
@@ -270,9 +386,9 @@ class MusicGenreSorterGUI:
         # Obsługa podwójnego kliknięcia dla ręcznej klasyfikacji
         self.results_tree.bind("<Double-1>", self.on_file_double_click)
         
-        results_scroll = ttk.Scrollbar(files_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
-        results_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        self.results_tree.configure(yscrollcommand=results_scroll.set)
+        self.results_scroll = ttk.Scrollbar(files_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
+        self.results_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.results_tree.configure(yscrollcommand=self.results_scroll.set)
         
         # Przyciski eksportu i klasyfikacji
         export_frame = ttk.Frame(results_frame)
@@ -296,7 +412,7 @@ class MusicGenreSorterGUI:
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         try:
             if THEME == "dark":
-                self.log_text.configure(bg="#1f1f1f", fg="#eaeaea", insertbackground="#eaeaea")
+                self.log_text.configure(**_DARK_TEXT)
         except Exception:
             pass
         
@@ -306,111 +422,106 @@ class MusicGenreSorterGUI:
         
         ttk.Button(log_buttons_frame, text="Wyczyść logi", 
                   command=self.clear_logs).pack(side=tk.LEFT)
-        ttk.Button(log_buttons_frame, text="Zapisz logi", 
+        ttk.Button(log_buttons_frame, text="Zapisz logi",
                   command=self.save_logs).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(log_buttons_frame, text="Wyczyść cache metadanych",
+                  command=self.clear_metadata_cache).pack(side=tk.LEFT, padx=(5, 0))
         
     def setup_styles(self):
         """Konfiguruje style interfejsu"""
-        style = ttk.Style()
+        style = self._style
 
         # Konfiguracja kolorów dla ciemnego motywu
         if THEME == "dark":
-            style.theme_use("clam")
-            style.configure("TLabel", background="#2b2b2b", foreground="#ffffff")
-            style.configure("TFrame", background="#2b2b2b")
-            style.configure("TLabelFrame", background="#2b2b2b", foreground="#ffffff")
-            style.configure("TButton", background="#3a3a3a", foreground="#ffffff")
-            style.configure("Horizontal.TProgressbar", background="#5c9ded")
-            style.configure("Treeview", background="#2b2b2b", foreground="#ffffff", fieldbackground="#2b2b2b")
-            style.configure("Treeview.Heading", background="#3a3a3a", foreground="#ffffff")
+            try:
+                style.theme_use("clam")
+            except tk.TclError:
+                pass  # egzotyczne buildy Tk mogą nie mieć motywu clam
+            for name, opts in _DARK_STYLES.items():
+                style.configure(name, **opts)
             style.map("Treeview", background=[("selected", "#3a3a3a")], foreground=[("selected", "#ffffff")])
-            style.configure("TNotebook", background="#2b2b2b")
-            style.configure("TNotebook.Tab", background="#3a3a3a", foreground="#ffffff")
             style.map("TNotebook.Tab", background=[("selected", "#5c5c5c")])
-            style.configure("TCheckbutton", background="#2b2b2b", foreground="#ffffff")
-            style.configure("TRadiobutton", background="#2b2b2b", foreground="#ffffff")
-            style.configure("TEntry", fieldbackground="#1f1f1f", foreground="#ffffff")
-            # Teksty w panelach
-            try:
-                self.root.configure(bg="#2b2b2b")
-            except Exception:
-                pass
+            self.root.configure(bg="#2b2b2b")
             # Tk klasyczne widgety: Text / Listbox wymagają ręcznej konfiguracji
-            try:
-                if hasattr(self, 'stats_text') and isinstance(self.stats_text, tk.Text):
-                    self.stats_text.configure(bg="#1f1f1f", fg="#eaeaea", insertbackground="#eaeaea")
-                if hasattr(self, 'log_text'):
-                    self.log_text.configure(bg="#1f1f1f", fg="#eaeaea", insertbackground="#eaeaea")
-                # Listbox w dialogu ręcznej klasyfikacji ustawimy przy tworzeniu
-            except Exception:
-                pass
+            # (Listbox w dialogu ręcznej klasyfikacji ustawiamy przy tworzeniu)
+            self._configure_text_widgets(_DARK_TEXT)
+
+    def _configure_text_widgets(self, palette):
+        """Konfiguruje klasyczne widgety Tk (Text), których ttk.Style nie obejmuje"""
+        if getattr(self, 'stats_text', None) is not None:
+            self.stats_text.configure(**palette)
+        if getattr(self, 'log_text', None) is not None:
+            self.log_text.configure(**palette)
 
     def apply_theme(self):
         """Zastosowuje wybrany motyw (light/dark) dynamicznie"""
         chosen = self.theme_var.get()
-        style = ttk.Style()
+        style = self._style
         if chosen == "dark":
-            style.theme_use("clam")
-            style.configure("TLabel", background="#2b2b2b", foreground="#ffffff")
-            style.configure("TFrame", background="#2b2b2b")
-            style.configure("TLabelFrame", background="#2b2b2b", foreground="#ffffff")
-            style.configure("TButton", background="#3a3a3a", foreground="#ffffff")
-            style.configure("Horizontal.TProgressbar", background="#5c9ded")
             try:
-                self.root.configure(bg="#2b2b2b")
-            except Exception:
+                style.theme_use("clam")
+            except tk.TclError:
                 pass
-            # Skonfiguruj panel AI dla dark
-            # Zostawiamy panel uzasadnień w czerni na białym tle dla czytelności
-            try:
-                self.ai_panel_frame.configure(style="TLabelFrame")
-                if isinstance(self.ai_reason_label, tk.Text):
-                    self.ai_reason_label.configure(bg="#ffffff", fg="#000000", insertbackground="#000000")
-                else:
-                    self.ai_reason_label.configure(bg="#ffffff", fg="#000000")
-            except Exception:
-                pass
-            # Tekstowe widgety
-            try:
-                if hasattr(self, 'stats_text'):
-                    self.stats_text.configure(bg="#1f1f1f", fg="#eaeaea", insertbackground="#eaeaea")
-                if hasattr(self, 'log_text'):
-                    self.log_text.configure(bg="#1f1f1f", fg="#eaeaea", insertbackground="#eaeaea")
-            except Exception:
-                pass
-            self.apply_user_theme(ttk.Style())
+            for name, opts in _DARK_STYLES.items():
+                style.configure(name, **opts)
+            self.root.configure(bg="#2b2b2b")
+            # Panel uzasadnień zostaje w czerni na białym tle dla czytelności
+            self.ai_panel_frame.configure(style="TLabelFrame")
+            style.configure("AIReason.TLabel", background="#ffffff", foreground="#000000")
+            self._configure_text_widgets(_DARK_TEXT)
+            self.apply_user_theme(style)
         else:
-            style.theme_use("default")
-            style.configure("TLabel", background="#f0f0f0", foreground="#000000")
-            style.configure("TFrame", background="#f0f0f0")
-            style.configure("TLabelFrame", background="#f0f0f0", foreground="#000000")
-            style.configure("TButton", background="#e0e0e0", foreground="#000000")
             try:
-                self.root.configure(bg="#f0f0f0")
-            except Exception:
+                style.theme_use("default")
+            except tk.TclError:
                 pass
-            try:
-                self.ai_panel_frame.configure(style="TLabelFrame")
-                if isinstance(self.ai_reason_label, tk.Text):
-                    self.ai_reason_label.configure(bg="#ffffff", fg="#000000", insertbackground="#000000")
-                else:
-                    self.ai_reason_label.configure(bg="#ffffff", fg="#000000")
-            except Exception:
-                pass
-            try:
-                if hasattr(self, 'stats_text'):
-                    self.stats_text.configure(bg="#ffffff", fg="#000000", insertbackground="#000000")
-                if hasattr(self, 'log_text'):
-                    self.log_text.configure(bg="#ffffff", fg="#000000", insertbackground="#000000")
-            except Exception:
-                pass
-            self.apply_user_theme(ttk.Style())
+            for name, opts in _LIGHT_STYLES.items():
+                style.configure(name, **opts)
+            self.root.configure(bg="#f0f0f0")
+            self.ai_panel_frame.configure(style="TLabelFrame")
+            style.configure("AIReason.TLabel", background="#ffffff", foreground="#000000")
+            self._configure_text_widgets(_LIGHT_TEXT)
+            self.apply_user_theme(style)
+
+    def _read_json(self, path):
+        """
+        Czyta plik JSON z cache'em unieważnianym przez mtime
+
+        Pliki ustawień i motywu są czytane z kilku miejsc (każde przełączenie
+        motywu woła apply_user_theme dwukrotnie); niezmieniony plik kosztuje
+        tu tylko os.stat zamiast open+parse.
+        """
+        st = os.stat(path)
+        cached = self._json_cache.get(path)
+        if cached is not None and cached[0] == st.st_mtime_ns:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._json_cache[path] = (st.st_mtime_ns, data)
+        return data
+
+    def _write_json(self, path, data):
+        """
+        Zapisuje plik JSON atomowo i tylko gdy zawartość się zmieniła
+
+        Zapis idzie do pliku tymczasowego i os.replace, więc czytelnik nigdy
+        nie zobaczy na wpół zapisanego pliku. Jeśli dane są identyczne z
+        wersją w cache'u _read_json, zapis jest pomijany - klik "Zapisz" bez
+        zmian nie dotyka dysku i nie unieważnia cache'a.
+        """
+        cached = self._json_cache.get(path)
+        if cached is not None and cached[1] == data:
+            return
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        self._json_cache[path] = (os.stat(path).st_mtime_ns, data)
 
     def _load_saved_api_keys(self):
         """Wczytuje klucze API z pliku user_settings.json do zmiennych środowiskowych"""
         try:
-            with open('user_settings.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._read_json('user_settings.json')
             for env_key in ['SPOTIFY_CLIENT_ID', 'SPOTIFY_CLIENT_SECRET', 'LASTFM_API_KEY', 'OPENAI_API_KEY']:
                 if data.get(env_key):
                     os.environ[env_key] = data[env_key]
@@ -419,8 +530,7 @@ class MusicGenreSorterGUI:
 
     def load_user_settings(self):
         try:
-            with open('user_settings.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._read_json('user_settings.json')
             self.spotify_id_var.set(data.get('SPOTIFY_CLIENT_ID', ''))
             self.spotify_secret_var.set(data.get('SPOTIFY_CLIENT_SECRET', ''))
             self.lastfm_key_var.set(data.get('LASTFM_API_KEY', ''))
@@ -436,27 +546,25 @@ class MusicGenreSorterGUI:
             'OPENAI_API_KEY': self.openai_key_var.get()
         }
         try:
-            with open('user_settings.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._write_json('user_settings.json', data)
             # Aktualizuj środowisko i klienta
             self._load_saved_api_keys()
-            # Przeładuj WebSearcher z nowym kluczem
-            self.web_searcher = WebSearcher()
+            # Przeładuj poświadczenia istniejącego WebSearchera - sesja HTTP
+            # zostaje, więc nie płacimy ponownie za otwieranie połączeń
+            self._get_web_searcher().reload_credentials()
             messagebox.showinfo("Zapisano", "Ustawienia API zapisane i zastosowane.")
         except Exception as e:
             messagebox.showerror("Błąd", f"Nie udało się zapisać: {e}")
 
     def load_user_theme(self):
         try:
-            with open('user_theme.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self._read_json('user_theme.json')
         except Exception:
             return {}
 
     def save_user_theme(self, theme_dict):
         try:
-            with open('user_theme.json', 'w', encoding='utf-8') as f:
-                json.dump(theme_dict, f, ensure_ascii=False, indent=2)
+            self._write_json('user_theme.json', theme_dict)
         except Exception:
             pass
 
@@ -563,16 +671,41 @@ class MusicGenreSorterGUI:
             dialog.destroy()
         ttk.Button(btns, text="Anuluj", command=cancel).pack(side=tk.RIGHT, padx=(10,0))
     
+    def _on_conf_change(self, value):
+        """
+        Debounce suwaka pewności
+
+        Przeciąganie wywołuje command dla każdego piksela ruchu; zmienne Tk
+        (i trace etykiety) aktualizujemy dopiero po 50 ms pauzy, więc koszt
+        to jedno odświeżenie na przeciągnięcie zamiast jednego na piksel.
+        """
+        if self._conf_job:
+            self.root.after_cancel(self._conf_job)
+        self._conf_job = self.root.after(50, lambda v=value: self._apply_conf_change(v))
+
+    def _apply_conf_change(self, value):
+        """Zastosowuje odłożoną wartość suwaka pewności"""
+        self._conf_job = None
+        rounded = round(float(value), 2)
+        self.min_confidence.set(rounded)
+        self.min_confidence_label.set(f"{rounded:.2f}")
+
     def browse_source_dir(self):
         """Otwiera dialog wyboru katalogu źródłowego"""
-        directory = filedialog.askdirectory(title="Wybierz katalog z muzyką")
+        directory = filedialog.askdirectory(
+            title="Wybierz katalog z muzyką",
+            initialdir=self._last_browse_dir or self.source_dir.get() or str(DEFAULT_MUSIC_DIR))
         if directory:
+            self._last_browse_dir = directory
             self.source_dir.set(directory)
-    
+
     def browse_output_dir(self):
         """Otwiera dialog wyboru katalogu docelowego"""
-        directory = filedialog.askdirectory(title="Wybierz katalog docelowy")
+        directory = filedialog.askdirectory(
+            title="Wybierz katalog docelowy",
+            initialdir=self._last_browse_dir or self.output_dir.get() or str(DEFAULT_OUTPUT_DIR))
         if directory:
+            self._last_browse_dir = directory
             self.output_dir.set(directory)
     
     def scan_files(self):
@@ -585,24 +718,70 @@ class MusicGenreSorterGUI:
         
         self.log_message("Rozpoczynam skanowanie plików...")
         self.status_var.set("Skanowanie plików...")
-        
+        self.progress_var.set(0)
+        self._last_progress = None
+        self._last_status = None
+
         # Uruchomienie w osobnym wątku
         thread = threading.Thread(target=self._scan_files_thread, args=(source_path,))
         thread.daemon = True
         thread.start()
-    
+
+        # Uruchomienie monitorowania postępu
+        self.root.after(100, self._check_progress)
+
     def _scan_files_thread(self, source_path):
-        """Wątek skanowania plików"""
+        """Wątek skanowania plików - odczyty tagów rozłożone na pulę wątków"""
         try:
-            self.music_files = self.metadata_analyzer.scan_directory(
+            analyzer = self._get_metadata_analyzer()
+            paths = list(analyzer.iter_candidate_paths(
                 source_path, self.recursive_scan.get()
-            )
-            
-            self.root.after(0, self._scan_files_complete)
-            
+            ))
+            total = len(paths)
+            metadata_by_path = {}
+
+            if paths:
+                # Odczyt tagów jest I/O-bound (dysk/sieć), więc pula wątków
+                # daje niemal liniowe przyspieszenie na dużych bibliotekach
+                max_workers = min(32, (os.cpu_count() or 4) * 4)
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(analyzer.analyze_one, p): p
+                        for p in paths
+                    }
+                    for done, future in enumerate(as_completed(futures), 1):
+                        path = futures[future]
+                        try:
+                            metadata_by_path[str(path)] = future.result()
+                        except Exception as e:
+                            # log_message dotyka widżetów - tylko z wątku GUI
+                            self.root.after(0, lambda p=path, err=e: self.log_message(
+                                f"Błąd odczytu metadanych {p.name}: {err}"))
+
+                        self._put_coalescable('progress', (done / total) * 100)
+                        if done % 25 == 0 or done == total:
+                            self._put_coalescable('status', f"Skanowanie {done}/{total} plików...")
+
+            self.music_files = paths
+            self._scanned_metadata = metadata_by_path
+            self.progress_queue.put(('scan_complete', None))
+
         except Exception as e:
-            self.root.after(0, lambda: self._show_error(f"Błąd podczas skanowania: {e}"))
+            self.progress_queue.put(('error', str(e)))
     
+    def _put_coalescable(self, msg_type, data):
+        """
+        Wrzuca komunikat progress/status bez blokowania workera
+
+        Konsument i tak pokazuje tylko ostatnią wartość z każdego cyklu, więc
+        przy pełnej kolejce taki komunikat można po prostu upuścić. Wiersze
+        wyników i komunikaty końcowe idą zwykłym put() - tych gubić nie wolno.
+        """
+        try:
+            self.progress_queue.put_nowait((msg_type, data))
+        except queue.Full:
+            pass
+
     def _scan_files_complete(self):
         """Callback po zakończeniu skanowania"""
         count = len(self.music_files)
@@ -620,21 +799,23 @@ class MusicGenreSorterGUI:
         
         self.log_message("Rozpoczynam analizę i klasyfikację...")
         self.status_var.set("Analizowanie plików...")
+        # Wiersze wyników przychodzą przyrostowo z wątku roboczego
+        self.results_tree.delete(*self.results_tree.get_children())
+        self._item_to_classification = {}
+        # Świeży cache webowy na każdy przebieg analizy
+        self._search_cache = {}
+        self._enhance_cache = {}
         self.progress_var.set(0)
-        # Wyczyść panel uzasadnień AI (pojedyncza wiadomość)
-        try:
-            # Reset panelu i bufora uzasadnień przy starcie nowej analizy
-            self._set_ai_reason_text("")
-            self.ai_reasons_cache = []
-            self._current_ai_text = ""
-            if self._rotation_job:
-                try:
-                    self.root.after_cancel(self._rotation_job)
-                except Exception:
-                    pass
-                self._rotation_job = None
-        except Exception:
-            pass
+        self._last_progress = None
+        self._last_status = None
+        # Reset panelu i bufora uzasadnień przy starcie nowej analizy
+        self._stop_rotation()
+        self._set_ai_reason_text("")
+        self.ai_reasons_cache = []
+        self._ai_reasons_seen = set()
+        self._current_ai_text = ""
+        self._rotation_order = []
+        self._rotation_cursor = 0
         
         # Uruchomienie w osobnym wątku
         thread = threading.Thread(target=self._analyze_files_thread)
@@ -644,225 +825,341 @@ class MusicGenreSorterGUI:
         # Uruchomienie monitorowania postępu
         self.root.after(100, self._check_progress)
     
+    def _web_cache_get(self, disk_key):
+        """Odczyt z trwałego cache'a webowego (None przy chybieniu/błędzie)"""
+        if self._web_disk_cache is None:
+            return None
+        with self._web_cache_lock:
+            try:
+                return self._web_disk_cache.get(disk_key)
+            except Exception:
+                return None
+
+    def _web_cache_put(self, disk_key, value):
+        """Zapis do trwałego cache'a webowego z okresowym sync()"""
+        if self._web_disk_cache is None:
+            return
+        with self._web_cache_lock:
+            try:
+                self._web_disk_cache[disk_key] = value
+                self._web_cache_writes += 1
+                if self._web_cache_writes % 100 == 0:
+                    self._web_disk_cache.sync()
+            except Exception:
+                pass
+
+    def _cached_search_track_info(self, searcher, artist, title):
+        """search_track_info z cache'em per-analiza i trwałym na (artysta, tytuł)"""
+        key = (artist.lower(), title.lower())
+        with self._web_cache_lock:
+            cached = self._search_cache.get(key)
+        if cached is not None:
+            return cached
+        disk_key = f"search|{key[0]}|{key[1]}"
+        cached = self._web_cache_get(disk_key)
+        if cached is not None:
+            with self._web_cache_lock:
+                self._search_cache[key] = cached
+            return cached
+        result = searcher.search_track_info(artist, title)
+        with self._web_cache_lock:
+            self._search_cache[key] = result
+        self._web_cache_put(disk_key, result)
+        return result
+
+    def _cached_enhance_metadata(self, searcher, metadata, filename):
+        """
+        enhance_metadata_with_ai z cache'em per-analiza na (artysta, tytuł)
+
+        Cache'ujemy tylko deltę, którą AI dołożyło do metadanych - pełny
+        wynik zawiera pola specyficzne dla pliku (ścieżkę, rozmiar, czas
+        trwania), których nie wolno współdzielić między duplikatami.
+        """
+        artist = (metadata.get('artist') or '').lower()
+        title = (metadata.get('title') or '').lower()
+        if not artist or not title:
+            return searcher.enhance_metadata_with_ai(metadata, filename)
+        key = (artist, title)
+        with self._web_cache_lock:
+            delta = self._enhance_cache.get(key)
+        if delta is None:
+            delta = self._web_cache_get(f"enhance|{artist}|{title}")
+            if delta is not None:
+                with self._web_cache_lock:
+                    self._enhance_cache[key] = delta
+        if delta is not None:
+            merged = dict(metadata)
+            merged.update(delta)
+            return merged
+        enhanced = searcher.enhance_metadata_with_ai(metadata, filename)
+        delta = {k: v for k, v in enhanced.items() if metadata.get(k) != v}
+        with self._web_cache_lock:
+            self._enhance_cache[key] = delta
+        self._web_cache_put(f"enhance|{artist}|{title}", delta)
+        return enhanced
+
+    def _analyze_one(self, file_path, analyzer, classifier, searcher):
+        """
+        Analizuje pojedynczy plik (worker dla puli wątków)
+
+        Zwraca klasyfikację z dołączonymi metadanymi i web_info; uzasadnienie
+        AI wrzuca od razu do kolejki postępu.
+        """
+        # Analiza metadanych - preferuj wynik odczytany już
+        # podczas równoległego skanowania
+        metadata = self._scanned_metadata.get(str(file_path))
+        if metadata is None:
+            metadata = analyzer.extract_metadata(file_path)
+
+        # Wyszukiwanie w internecie i uzupełnianie przez ChatGPT (jeśli włączone)
+        web_info = None
+        structure_detected = True
+        if searcher is not None:
+            artist = metadata.get('artist', '')
+            title = metadata.get('title', '')
+
+            if artist and title:
+                # Oba żądania są niezależne (OpenAI vs Spotify/Last.fm),
+                # więc wyszukiwanie leci w osobnym wątku, a uzupełnianie
+                # metadanych w bieżącym - nakładamy dwa okrążenia sieci
+                search_result = {}
+
+                def _search_worker():
+                    search_result['web_info'] = self._cached_search_track_info(searcher, artist, title)
+
+                search_thread = threading.Thread(target=_search_worker, daemon=True)
+                search_thread.start()
+                metadata = self._cached_enhance_metadata(searcher, metadata, file_path.name)
+                search_thread.join()
+                web_info = search_result.get('web_info')
+            else:
+                # Bez artysty/tytułu wyszukiwanie zależy od wyniku
+                # uzupełniania i parsowania nazwy pliku - sekwencyjnie
+                metadata = self._cached_enhance_metadata(searcher, metadata, file_path.name)
+                artist = metadata.get('artist', '')
+                title = metadata.get('title', '')
+
+                if not artist or not title:
+                    # Próba wyciągnięcia z nazwy pliku i sprawdzenie struktury
+                    filename_info = searcher.search_by_filename(file_path.name)
+                    artist = filename_info.get('artist', artist)
+                    title = filename_info.get('title', title)
+                    structure_detected = filename_info.get('structure_detected', False)
+
+                if artist and title:
+                    web_info = self._cached_search_track_info(searcher, artist, title)
+
+        # Jeśli nie wykryto struktury "Artysta - Tytuł", nie klasyfikujemy
+        if not structure_detected:
+            classification = {
+                'file_path': str(file_path),
+                'primary_genre': 'unknown',
+                'confidence_score': 0.0,
+                'suggested_folder': 'Unsorted'
+            }
+            # Wyślij uzasadnienie do panelu AI (krótka informacja, bez nazwy pliku)
+            reason_msg = "Brak wykrytej struktury 'Artysta - Tytuł'. Plik przeniesiony do 'Unsorted'."
+            self.progress_queue.put(('ai_reason', reason_msg))
+        else:
+            # Klasyfikacja gatunku
+            classification = classifier.classify_track(metadata, web_info)
+            # Wydobądź uzasadnienie z AI jeśli dostępne
+            reason_msg = None
+            try:
+                if web_info and isinstance(web_info, dict):
+                    ai_analysis = web_info.get('additional_info', {}).get('ai_analysis', {})
+                    if ai_analysis.get('reasoning'):
+                        reason_msg = ai_analysis.get('reasoning')
+                if not reason_msg and metadata.get('ai_reasoning'):
+                    reason_msg = metadata.get('ai_reasoning')
+                # Fallback: krótki opis źródeł punktacji
+                if not reason_msg and classification.get('analysis_details'):
+                    breakdown = classification['analysis_details'].get('score_breakdown', {})
+                    top_sources = []
+                    for genre, data in breakdown.items():
+                        sources = data.get('sources', [])
+                        if sources:
+                            top_sources.append(f"{genre}: {', '.join(sources[:3])}")
+                    if top_sources:
+                        reason_msg = "Źródła klasyfikacji -> " + ", ".join(top_sources[:3])
+            except Exception:
+                pass
+            if reason_msg:
+                self.progress_queue.put(('ai_reason', reason_msg))
+
+        classification['metadata'] = metadata
+        classification['web_info'] = web_info
+        return classification
+
     def _analyze_files_thread(self):
-        """Wątek analizy plików"""
+        """Wątek analizy plików - fan-out na pulę wątków"""
         try:
+            analyzer = self._get_metadata_analyzer()
+            classifier = self._get_genre_classifier()
+            searcher = self._get_web_searcher() if self.use_web_search.get() else None
             self.classifications = []
+            self._conf_col = []
+            self._folder_col = []
             total_files = len(self.music_files)
-            
-            for i, file_path in enumerate(self.music_files):
-                # Analiza metadanych
-                metadata = self.metadata_analyzer.extract_metadata(file_path)
-                
-                # Uzupełnianie brakujących metadanych przez ChatGPT (jeśli włączone)
-                if self.use_web_search.get():
-                    metadata = self.web_searcher.enhance_metadata_with_ai(metadata, file_path.name)
-                
-                # Wyszukiwanie w internecie (jeśli włączone)
-                web_info = None
-                structure_detected = True
-                if self.use_web_search.get():
-                    artist = metadata.get('artist', '')
-                    title = metadata.get('title', '')
-                    
-                    if not artist or not title:
-                        # Próba wyciągnięcia z nazwy pliku i sprawdzenie struktury
-                        filename_info = self.web_searcher.search_by_filename(file_path.name)
-                        artist = filename_info.get('artist', artist)
-                        title = filename_info.get('title', title)
-                        structure_detected = filename_info.get('structure_detected', False)
-                    
-                    if artist and title:
-                        web_info = self.web_searcher.search_track_info(artist, title)
-                
-                # Jeśli nie wykryto struktury "Artysta - Tytuł", nie klasyfikujemy
-                if not structure_detected:
-                    classification = {
-                        'file_path': str(file_path),
-                        'primary_genre': 'unknown',
-                        'confidence_score': 0.0,
-                        'suggested_folder': 'Unsorted'
-                    }
-                    # Wyślij uzasadnienie do panelu AI (krótka informacja, bez nazwy pliku)
-                    reason_msg = "Brak wykrytej struktury 'Artysta - Tytuł'. Plik przeniesiony do 'Unsorted'."
-                    self.progress_queue.put(('ai_reason', reason_msg))
-                else:
-                    # Klasyfikacja gatunku
-                    classification = self.genre_classifier.classify_track(metadata, web_info)
-                    # Wydobądź uzasadnienie z AI jeśli dostępne
-                    reason_msg = None
-                    try:
-                        if web_info and isinstance(web_info, dict):
-                            ai_analysis = web_info.get('additional_info', {}).get('ai_analysis', {})
-                            if ai_analysis.get('reasoning'):
-                                reason_msg = ai_analysis.get('reasoning')
-                        if not reason_msg and metadata.get('ai_reasoning'):
-                            reason_msg = metadata.get('ai_reasoning')
-                        # Fallback: krótki opis źródeł punktacji
-                        if not reason_msg and classification.get('analysis_details'):
-                            breakdown = classification['analysis_details'].get('score_breakdown', {})
-                            top_sources = []
-                            for genre, data in breakdown.items():
-                                sources = data.get('sources', [])
-                                if sources:
-                                    top_sources.append(f"{genre}: {', '.join(sources[:3])}")
-                            if top_sources:
-                                reason_msg = "Źródła klasyfikacji -> " + ", ".join(top_sources[:3])
-                    except Exception:
-                        pass
-                    if reason_msg:
-                        self.progress_queue.put(('ai_reason', reason_msg))
-                
-                classification['metadata'] = metadata
-                classification['web_info'] = web_info
-                
-                self.classifications.append(classification)
-                
-                # Aktualizacja postępu
-                progress = ((i + 1) / total_files) * 100
-                self.progress_queue.put(('progress', progress))
-                self.progress_queue.put(('status', f"Analizowanie {i+1}/{total_files}: {file_path.name}"))
-            
+            append_lock = threading.Lock()
+            # Komunikat statusu co ~1% plików - niezależnie od rozmiaru
+            # biblioteki do kolejki trafia najwyżej ~100 statusów
+            status_every = max(1, total_files // 100)
+
+            # Gorąca pętla zbierania wyników: łańcuchy atrybutów związane
+            # raz do lokalnych nazw, żeby każde ukończenie kosztowało same
+            # wywołania zamiast powtórnych LOAD_ATTR
+            append_classification = self.classifications.append
+            append_conf = self._conf_col.append
+            append_folder = self._folder_col.append
+            put = self.progress_queue.put
+            put_coalescable = self._put_coalescable
+            format_row = self._format_result_row
+
+            # Każdy plik to niezależna sekwencja blokujących wywołań
+            # (dysk + dwa żądania HTTP), więc pula wątków skraca czas
+            # ściany mniej więcej liczbą workerów
+            with ThreadPoolExecutor(max_workers=min(16, max(total_files, 1))) as executor:
+                futures = {
+                    executor.submit(self._analyze_one, fp, analyzer, classifier, searcher): fp
+                    for fp in self.music_files
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    file_path = futures[future]
+                    classification = future.result()
+
+                    with append_lock:
+                        append_classification(classification)
+                        append_conf(classification.get('confidence_score', 0))
+                        append_folder(classification.get('suggested_folder'))
+
+                    # Formatowanie wiersza po stronie workera - wątek GUI robi
+                    # już tylko wstawienie do drzewa
+                    put(('row', (format_row(classification), classification)))
+
+                    # Aktualizacja postępu
+                    put_coalescable('progress', (done / total_files) * 100)
+                    if done % status_every == 0 or done == total_files:
+                        put_coalescable('status', f"Analizowanie {done}/{total_files}: {file_path.name}")
+
             self.progress_queue.put(('complete', None))
-            
+
         except Exception as e:
             self.progress_queue.put(('error', str(e)))
     
     def _check_progress(self):
         """Sprawdza postęp analizy"""
+        # Komunikaty progress/status są koalescowane: liczy się tylko
+        # ostatnia wartość z tej porcji, więc zmienne Tk (i ich trace'y
+        # wymuszające odrysowanie) aktualizujemy najwyżej raz na tick,
+        # niezależnie od tempa wątku roboczego
+        last_progress = None
+        last_status = None
+        rows = []
+        terminal = None
         try:
             while True:
                 msg_type, data = self.progress_queue.get_nowait()
-                
+
                 if msg_type == 'progress':
-                    self.progress_var.set(data)
+                    last_progress = data
                 elif msg_type == 'status':
-                    self.status_var.set(data)
+                    last_status = data
+                elif msg_type == 'row':
+                    rows.append(data)
                 elif msg_type == 'ai_reason':
                     self._append_ai_reason(str(data))
-                elif msg_type == 'complete':
-                    self._analysis_complete()
-                    return
-                elif msg_type == 'error':
-                    self._show_error(f"Błąd podczas analizy: {data}")
-                    return
-                    
+                else:
+                    # scan_complete/complete/error - dokończ tę porcję
+                    # (wiersze, postęp) zanim obsłużymy komunikat końcowy
+                    terminal = (msg_type, data)
+                    break
+
         except queue.Empty:
             pass
-        
+
+        if rows:
+            self._append_result_rows(rows)
+        self._flush_log_buffer()
+        if last_progress is not None and last_progress != self._last_progress:
+            self._last_progress = last_progress
+            self.progress_var.set(last_progress)
+        if last_status is not None and last_status != self._last_status:
+            self._last_status = last_status
+            self.status_var.set(last_status)
+
+        if terminal is not None:
+            msg_type, data = terminal
+            if msg_type == 'scan_complete':
+                self._scan_files_complete()
+            elif msg_type == 'complete':
+                self._analysis_complete()
+            elif msg_type == 'error':
+                self._show_error(f"Błąd podczas analizy: {data}")
+            return
+
         # Sprawdź ponownie za 100ms
         self.root.after(100, self._check_progress)
 
     def _append_ai_reason(self, text: str):
         """Dodaje pełne uzasadnienie AI do bufora i uruchamia rotację."""
-        try:
-            summary = text.strip()
-            # Dodaj do bufora (unikaj duplikatów kolejnych)
-            if not self.ai_reasons_cache or self.ai_reasons_cache[-1] != summary:
-                self.ai_reasons_cache.append(summary)
-            # Jeśli nie ma nic na ekranie i mamy przynajmniej 1 wpis – zacznij rotację
-            if not self._current_ai_text and len(self.ai_reasons_cache) >= 1:
-                self._start_rotation()
-        except Exception:
-            pass
-
-    def _start_rotation(self):
-        """Uruchamia rotację wyświetlania: co 30s losowy opis z bufora, bez wygaszania."""
-        try:
-            # Bezpiecznie anuluj poprzednie rotacje
-            if self._rotation_job:
-                self.root.after_cancel(self._rotation_job)
-        except Exception:
-            pass
-        finally:
-            self._rotation_job = None
+        summary = text.strip()
+        if not summary:
+            return
+        # Globalna deduplikacja przez zbiór pomocniczy - klasyfikator chętnie
+        # powtarza identyczne uzasadnienia, a bufor ma zostać ograniczony
+        if summary not in self._ai_reasons_seen:
+            self._ai_reasons_seen.add(summary)
+            self.ai_reasons_cache.append(summary)
+            if len(self.ai_reasons_cache) > 200:
+                self._ai_reasons_seen.discard(self.ai_reasons_cache.pop(0))
+                # Indeksy permutacji rotacji przestały pasować do bufora
+                self._rotation_order = []
+        # Kolejne wpisy tylko zasilają bufor - pętla rotacji jest jedna
+        if self._rotation_job is None:
+            self._rotation_tick()
 
-        def show_random_reason():
-            if not self.ai_reasons_cache:
-                return
-            # Wybór losowego uzasadnienia
-            import random
-            if len(self.ai_reasons_cache) > 1 and self._current_ai_text:
-                # wybierz inną niż obecna, jeśli możliwe
-                candidates = [t for t in self.ai_reasons_cache if t != self._current_ai_text]
-                next_text = random.choice(candidates) if candidates else random.choice(self.ai_reasons_cache)
-            else:
-                next_text = random.choice(self.ai_reasons_cache)
-            # Jeśli ekran pusty – po prostu pokaż
-            if not self._current_ai_text:
-                self._set_ai_reason_text("")
-                self._fade_set_text(next_text)
-            else:
-                # Podmień tekst natychmiast bez wygaszania
-                self.ai_next_reason = next_text
-                self._swap_to_next_ai_reason()
-            # Zaplanuj następną rotację za 30s
-            self._rotation_job = self.root.after(30000, show_random_reason)
+    def _rotation_tick(self):
+        """
+        Pojedyncza pętla rotacji panelu AI
 
-        # Pokaż pierwszy opis natychmiast
-        show_random_reason()
+        Co 30 s pokazuje losowy opis z bufora (inny niż bieżący, jeśli to
+        możliwe). Jedno zaplanowane zadanie after() niezależnie od liczby
+        zbuforowanych uzasadnień.
+        """
+        if not self.ai_reasons_cache:
+            self._rotation_job = None
+            return
 
-    # Usunięto skracanie, wyświetlamy pełne uzasadnienia
+        # Przetasowana permutacja indeksów z kursorem zamiast odbudowy listy
+        # kandydatów co tick - losowanie jest O(1), a pełny cykl gwarantuje
+        # brak natychmiastowych powtórek
+        cache_len = len(self.ai_reasons_cache)
+        if self._rotation_cursor >= len(self._rotation_order) or len(self._rotation_order) != cache_len:
+            self._rotation_order = random.sample(range(cache_len), cache_len)
+            self._rotation_cursor = 0
+            # Po przetasowaniu początek nowego cyklu mógłby powtórzyć
+            # bieżący tekst - wtedy przeskocz go
+            if (cache_len > 1 and self._current_ai_text
+                    and self.ai_reasons_cache[self._rotation_order[0]] == self._current_ai_text):
+                self._rotation_cursor = 1
 
-    def _fade_set_text(self, text: str):
-        """Ustawia tekst natychmiast w pełnej widoczności (bez animacji)."""
-        # Anuluj ewentualne wcześniejsze animacje (dla bezpieczeństwa)
-        try:
-            if self._fade_in_job:
-                self.root.after_cancel(self._fade_in_job)
-        except Exception:
-            pass
-        finally:
-            self._fade_in_job = None
-        try:
-            if self._fade_out_job:
-                self.root.after_cancel(self._fade_out_job)
-        except Exception:
-            pass
-        finally:
-            self._fade_out_job = None
+        next_text = self.ai_reasons_cache[self._rotation_order[self._rotation_cursor]]
+        self._rotation_cursor += 1
 
-        # Ustaw tekst natychmiast
-        self._set_ai_reason_text(text)
-        # Ustaw wysoką kontrastowość dla ciemnego motywu
-        # Kolor tekstu pozostaje czarny dla czytelności
-        self._current_ai_text = text
+        self._set_ai_reason_text(next_text)
+        self._current_ai_text = next_text
+        self._rotation_job = self.root.after(30000, self._rotation_tick)
 
-    def _swap_to_next_ai_reason(self):
-        """Natychmiast zamienia tekst na kolejny zapisany opis (bez wygaszania)."""
-        # Anuluj ewentualne animacje wygaszania (dla bezpieczeństwa)
-        try:
-            if self._fade_out_job:
-                self.root.after_cancel(self._fade_out_job)
-        except Exception:
-            pass
-        finally:
-            self._fade_out_job = None
-
-        next_text = getattr(self, 'ai_next_reason', None)
-        self.ai_next_reason = None
-        if next_text:
-            # Ustaw wysoką kontrastowość dla ciemnego motywu
-            # Kolor tekstu pozostaje czarny dla czytelności
-            self._set_ai_reason_text(next_text)
-            self._current_ai_text = next_text
-        else:
-            self._set_ai_reason_text("")
-            self._current_ai_text = ""
+    def _stop_rotation(self):
+        """Zatrzymuje pętlę rotacji panelu AI"""
+        if self._rotation_job:
+            self.root.after_cancel(self._rotation_job)
+            self._rotation_job = None
 
     def _set_ai_reason_text(self, text: str):
-        """Ustawia zawartość panelu uzasadnień (Text) jako pełny opis, bez skracania."""
-        try:
-            self.ai_reason_label.configure(state=tk.NORMAL)
-            self.ai_reason_label.delete("1.0", tk.END)
-            self.ai_reason_label.insert(tk.END, text)
-            self.ai_reason_label.configure(state=tk.DISABLED)
-        except Exception:
-            try:
-                # Fallback gdyby widget był innego typu
-                self.ai_reason_label.configure(text=text)
-            except Exception:
-                pass
+        """Ustawia zawartość panelu uzasadnień jako pełny opis, bez skracania."""
+        self._ai_reason_var.set(text)
     
     def _analysis_complete(self):
         """Callback po zakończeniu analizy"""
@@ -871,36 +1168,56 @@ class MusicGenreSorterGUI:
         self.status_var.set(f"Przeanalizowano {count} plików")
         self.progress_var.set(100)
         
-        # Aktualizacja wyników
-        self.update_results_display()
-        
+        # Wiersze trafiły do drzewa przyrostowo podczas analizy -
+        # zostaje aktualizacja statystyk
+        self.update_statistics()
+
         # Przełączenie na zakładkę wyników
         self.notebook.select(2)
     
+    def _rebuild_classification_columns(self):
+        """Odtwarza kolumny SoA po hurtowej podmianie klasyfikacji"""
+        self._conf_col = [c.get('confidence_score', 0) for c in self.classifications]
+        self._folder_col = [c.get('suggested_folder') for c in self.classifications]
+
     def sort_files(self):
         """Sortuje pliki do folderów"""
         if not self.classifications:
             messagebox.showwarning("Uwaga", "Najpierw przeanalizuj pliki!")
             return
         
-        # Filtrowanie według minimalnego poziomu pewności
+        # Filtrowanie według minimalnego poziomu pewności; pliki w
+        # "Unsorted" zawsze powinny być sortowane do tego folderu
         min_conf = self.min_confidence.get()
-        filtered_classifications = []
-        for c in self.classifications:
-            # Pliki w "Unsorted" zawsze powinny być sortowane do tego folderu
-            if c.get('suggested_folder') == 'Unsorted':
-                filtered_classifications.append(c)
-                continue
-            # Pozostałe filtrujemy po pewności
-            if c.get('confidence_score', 0) >= min_conf:
-                filtered_classifications.append(c)
+        try:
+            import numpy as np  # załadowana już przez klasyfikator
+        except ImportError:
+            np = None
+
+        if np is not None and len(self._conf_col) == len(self.classifications):
+            # Zwektoryzowany filtr na kolumnach zamiast pętli po słownikach
+            count = len(self._conf_col)
+            confs = np.fromiter(self._conf_col, dtype=np.float64, count=count)
+            unsorted = np.fromiter(
+                (f == 'Unsorted' for f in self._folder_col), dtype=bool, count=count
+            )
+            mask = (confs >= min_conf) | unsorted
+            filtered_classifications = [
+                self.classifications[i] for i in np.nonzero(mask)[0]
+            ]
+        else:
+            filtered_classifications = [
+                c for c in self.classifications
+                if c.get('suggested_folder') == 'Unsorted'
+                or c.get('confidence_score', 0) >= min_conf
+            ]
         
         if not filtered_classifications:
             messagebox.showwarning("Uwaga", "Żaden plik nie spełnia kryterium minimalnej pewności!")
             return
         
         # Konfiguracja organizatora plików
-        self.file_organizer.output_dir = Path(self.output_dir.get())
+        self._get_file_organizer().output_dir = Path(self.output_dir.get())
         
         self.log_message(f"Rozpoczynam sortowanie {len(filtered_classifications)} plików...")
         self.status_var.set("Sortowanie plików...")
@@ -913,7 +1230,7 @@ class MusicGenreSorterGUI:
     def _sort_files_thread(self, classifications):
         """Wątek sortowania plików"""
         try:
-            report = self.file_organizer.organize_files(classifications, self.dry_run.get(), self.use_pretty_names.get(), self.copy_files.get())
+            report = self._get_file_organizer().organize_files(classifications, self.dry_run.get(), self.use_pretty_names.get(), self.copy_files.get())
             self.root.after(0, lambda: self._sort_files_complete(report))
             
         except Exception as e:
@@ -935,71 +1252,153 @@ class MusicGenreSorterGUI:
         # Wyświetlenie raportu
         self.show_sort_report(report)
     
+    @staticmethod
+    def _format_result_row(classification):
+        """Buduje krotkę wartości wiersza wyników dla drzewa"""
+        metadata = classification.get('metadata') or {}
+        return (
+            metadata.get('artist', 'Nieznany'),
+            metadata.get('title', metadata.get('filename', 'Nieznany')),
+            classification.get('primary_genre', 'unknown'),
+            f"{classification.get('confidence_score', 0):.2f}",
+            classification.get('suggested_folder', 'Other')
+        )
+
+    def _append_result_rows(self, rows):
+        """Dostawia gotowe wiersze (wartości, klasyfikacja) do drzewa wyników"""
+        if len(rows) >= 200:
+            # Duża porcja - opłaca się tryb z odpiętym drzewem
+            self.populate_results(rows)
+            return
+        insert = self.results_tree.insert
+        index = self._item_to_classification
+        for values, classification in rows:
+            index[insert('', 'end', values=values)] = classification
+
     def update_results_display(self):
         """Aktualizuje wyświetlanie wyników"""
         # Czyszczenie poprzednich wyników
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
-        
-        # Dodawanie nowych wyników
-        for classification in self.classifications:
-            metadata = classification.get('metadata', {})
-            artist = metadata.get('artist', 'Nieznany')
-            title = metadata.get('title', metadata.get('filename', 'Nieznany'))
-            genre = classification.get('primary_genre', 'unknown')
-            confidence = f"{classification.get('confidence_score', 0):.2f}"
-            folder = classification.get('suggested_folder', 'Other')
-            
-            self.results_tree.insert('', 'end', values=(artist, title, genre, confidence, folder))
-        
+        self.results_tree.delete(*self.results_tree.get_children())
+        self._item_to_classification = {}
+
+        # Krotki wartości budowane z góry, żeby gorąca pętla wstawiania
+        # wykonywała już tylko wywołania Tcl
+        rows = [(self._format_result_row(c), c) for c in self.classifications]
+        self.populate_results(rows)
+
         # Aktualizacja statystyk
         self.update_statistics()
+
+    def populate_results(self, rows, chunk_size=500):
+        """
+        Wstawia wiersze do drzewa wyników partiami
+
+        Na czas masowego wstawiania drzewo jest odpięte od układu i od
+        scrollbara - Tk nie przelicza wtedy geometrii ani pozycji suwaka po
+        każdym wierszu, co przy tysiącach rekordów skraca budowę widoku
+        o rząd wielkości. update_idletasks między partiami utrzymuje
+        responsywność okna.
+        """
+        tree = self.results_tree
+        tree.pack_forget()
+        tree.configure(yscrollcommand='')
+        try:
+            # Bezpośrednie tk.call omija pythonową otoczkę Treeview.insert
+            # (parsowanie kwargs i budowę opcji) przy każdym wierszu; przy
+            # masowym wstawianiu zostaje praktycznie samo przejście do Tcl
+            tk_call = tree.tk.call
+            tree_path = tree._w
+            index = self._item_to_classification
+            for start in range(0, len(rows), chunk_size):
+                for values, classification in rows[start:start + chunk_size]:
+                    item = str(tk_call(tree_path, 'insert', '', 'end', '-values', values))
+                    index[item] = classification
+                self.root.update_idletasks()
+        finally:
+            tree.configure(yscrollcommand=self.results_scroll.set)
+            tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True,
+                      before=self.results_scroll)
     
     def update_statistics(self):
         """Aktualizuje statystyki"""
         if not self.classifications:
             return
         
-        stats = self.genre_classifier.get_genre_statistics(self.classifications)
-        
-        stats_text = f"""Łączna liczba plików: {stats.get('total_tracks', 0)}
+        stats = self._get_genre_classifier().get_genre_statistics(self.classifications)
+
+        header = f"""Łączna liczba plików: {stats.get('total_tracks', 0)}
 Średni poziom pewności: {stats.get('average_confidence', 0):.2f}
 Pliki o wysokiej pewności (>0.7): {stats.get('high_confidence_tracks', 0)}
 Pliki o niskiej pewności (<0.3): {stats.get('low_confidence_tracks', 0)}
 
 Rozkład gatunków:
 """
-        
+
+        # Lista fragmentów + join zamiast doklejania += w pętli - budowa
+        # tekstu rośnie liniowo z liczbą gatunków zamiast kwadratowo
         genre_dist = stats.get('genre_distribution', {})
-        for genre, count in sorted(genre_dist.items(), key=lambda x: x[1], reverse=True):
-            percentage = (count / stats.get('total_tracks', 1)) * 100
-            stats_text += f"  {genre}: {count} ({percentage:.1f}%)\\n"
-        
+        total_tracks = stats.get('total_tracks', 1)
+        parts = [header]
+        parts.extend(
+            f"  {genre}: {count} ({(count / total_tracks) * 100:.1f}%)\n"
+            for genre, count in sorted(genre_dist.items(), key=lambda x: x[1], reverse=True)
+        )
+        stats_text = ''.join(parts)
+
         self.stats_text.delete(1.0, tk.END)
         self.stats_text.insert(1.0, stats_text)
     
+    def _folder_name(self, genre, classifier):
+        """Nazwa folderu dla gatunku przez słownikowy cache"""
+        name = self._folder_name_cache.get(genre)
+        if name is None:
+            name = classifier._get_folder_name(genre)
+            self._folder_name_cache[genre] = name
+        return name
+
     def populate_genres_tree(self):
         """Wypełnia drzewo gatunków"""
-        from config import ELECTRONIC_GENRES
-        
+        classifier = self._get_genre_classifier()
         for main_genre, subgenres in ELECTRONIC_GENRES.items():
-            folder_name = self.genre_classifier._get_folder_name(main_genre)
+            folder_name = self._folder_name(main_genre, classifier)
             parent = self.genres_tree.insert('', 'end', text=main_genre, values=(folder_name,))
             
             for subgenre in subgenres:
                 self.genres_tree.insert(parent, 'end', text=f"  {subgenre}", values=("",))
     
     def log_message(self, message):
-        """Dodaje wiadomość do logów"""
+        """Dodaje wiadomość do bufora logów (spłukiwanego porcjami)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}\\n"
-        
-        self.log_text.insert(tk.END, log_entry)
+        with self._log_lock:
+            self._log_buffer.append(f"[{timestamp}] {message}\n")
+        # Jedno zaplanowane spłukanie naraz - seria komunikatów to jedno
+        # wstawienie do widgetu zamiast insert+see na każdą linię
+        if self._log_flush_job is None:
+            self._log_flush_job = self.root.after(100, self._flush_log_buffer)
+
+    def _flush_log_buffer(self):
+        """Przenosi zbuforowane linie logu do widgetu jednym insertem"""
+        self._log_flush_job = None
+        with self._log_lock:
+            if not self._log_buffer:
+                return
+            text = "".join(self._log_buffer)
+            self._log_buffer.clear()
+        self.log_text.insert(tk.END, text)
         self.log_text.see(tk.END)
     
     def clear_logs(self):
         """Czyści logi"""
         self.log_text.delete(1.0, tk.END)
+
+    def clear_metadata_cache(self):
+        """Czyści trwały cache metadanych i bufor ostatniego skanu"""
+        try:
+            self._get_metadata_analyzer().clear_scan_cache()
+            self._scanned_metadata = {}
+            self.log_message("Cache metadanych został wyczyszczony")
+        except Exception as e:
+            messagebox.showerror("Błąd", f"Nie można wyczyścić cache: {e}")
     
     def save_logs(self):
         """Zapisuje logi do pliku"""
@@ -1031,27 +1430,61 @@ Rozkład gatunków:
         
         if filename:
             try:
-                import csv
                 with open(filename, 'w', newline='', encoding='utf-8') as f:
                     writer = csv.writer(f)
                     writer.writerow(['Plik', 'Artysta', 'Tytuł', 'Gatunek', 'Pewność', 'Folder'])
-                    
-                    for classification in self.classifications:
-                        metadata = classification.get('metadata', {})
-                        row = [
-                            metadata.get('filename', ''),
-                            metadata.get('artist', ''),
-                            metadata.get('title', ''),
-                            classification.get('primary_genre', ''),
-                            classification.get('confidence_score', 0),
-                            classification.get('suggested_folder', '')
-                        ]
-                        writer.writerow(row)
-                
+
+                    # writerows z generatorem - cała pętla biegnie w module
+                    # _csv zamiast wracać do Pythona przy każdym wierszu
+                    writer.writerows(
+                        (
+                            md.get('filename', ''),
+                            md.get('artist', ''),
+                            md.get('title', ''),
+                            c.get('primary_genre', ''),
+                            c.get('confidence_score', 0),
+                            c.get('suggested_folder', '')
+                        )
+                        for c in self.classifications
+                        for md in (c.get('metadata') or {},)
+                    )
+
                 messagebox.showinfo("Sukces", "Dane zostały wyeksportowane!")
             except Exception as e:
                 messagebox.showerror("Błąd", f"Nie można wyeksportować danych: {e}")
 
+    def _classification_from_csv_row(self, row, classifier, name_index):
+        """Buduje słownik klasyfikacji z wiersza CSV"""
+        file_name = row.get('Plik') or row.get('File') or ''
+        artist = row.get('Artysta') or row.get('Artist') or ''
+        title = row.get('Tytuł') or row.get('Title') or ''
+        genre = row.get('Gatunek') or row.get('Genre') or ''
+        confidence_str = row.get('Pewność') or row.get('Confidence') or '0'
+        folder = row.get('Folder') or ''
+
+        try:
+            confidence = float(confidence_str)
+        except Exception:
+            confidence = 0.0
+
+        # Odtwórz pełną ścieżkę pliku jeśli to możliwe - dopasowanie po
+        # nazwie idzie przez indeks zbudowany raz przed pętlą importu;
+        # bez trafienia zostaje sama nazwa (FileOrganizer zweryfikuje
+        # istnienie)
+        file_path = name_index.get(file_name, file_name)
+
+        return {
+            'file_path': file_path,
+            'primary_genre': genre or 'unknown',
+            'confidence_score': confidence,
+            'suggested_folder': folder or self._folder_name(genre or 'unknown', classifier),
+            'metadata': {
+                'filename': file_name,
+                'artist': artist,
+                'title': title
+            }
+        }
+
     def import_from_csv(self):
         """Importuje klasyfikacje z pliku CSV, bez ponownej analizy"""
         filename = filedialog.askopenfilename(
@@ -1061,56 +1494,22 @@ Rozkład gatunków:
         if not filename:
             return
         try:
-            import csv
-            imported = []
+            classifier = self._get_genre_classifier()
+            # Indeks nazwa -> ścieżka z zeskanowanego źródła; zamienia
+            # dopasowanie z O(wiersze x pliki) na jedno haszowanie na wiersz
+            name_index = {Path(p).name: p for p in self.music_files}
             with open(filename, 'r', newline='', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
                 # Oczekiwane nagłówki: Plik, Artysta, Tytuł, Gatunek, Pewność, Folder
-                for row in reader:
-                    file_name = row.get('Plik') or row.get('File') or ''
-                    artist = row.get('Artysta') or row.get('Artist') or ''
-                    title = row.get('Tytuł') or row.get('Title') or ''
-                    genre = row.get('Gatunek') or row.get('Genre') or ''
-                    confidence_str = row.get('Pewność') or row.get('Confidence') or '0'
-                    folder = row.get('Folder') or ''
-
-                    try:
-                        confidence = float(confidence_str)
-                    except Exception:
-                        confidence = 0.0
-
-                    # Odtwórz pełną ścieżkę pliku jeśli to możliwe
-                    # Jeżeli zeskanowaliśmy źródło, spróbuj dopasować po nazwie
-                    file_path = ''
-                    try:
-                        for p in self.music_files:
-                            if Path(p).name == file_name:
-                                file_path = p
-                                break
-                    except Exception:
-                        pass
-                    if not file_path:
-                        # Pozwól użyć samej nazwy; FileOrganizer zweryfikuje istnienie
-                        file_path = file_name
-
-                    classification = {
-                        'file_path': file_path,
-                        'primary_genre': genre or 'unknown',
-                        'confidence_score': confidence,
-                        'suggested_folder': folder or self.genre_classifier._get_folder_name(genre or 'unknown'),
-                        'metadata': {
-                            'filename': file_name,
-                            'artist': artist,
-                            'title': title
-                        }
-                    }
-                    imported.append(classification)
+                imported = [self._classification_from_csv_row(row, classifier, name_index)
+                            for row in reader]
 
             if not imported:
                 messagebox.showwarning("Uwaga", "Plik CSV nie zawiera danych do importu")
                 return
 
             self.classifications = imported
+            self._rebuild_classification_columns()
             self.update_results_display()
             self.log_message(f"Zaimportowano {len(imported)} rekordów z CSV")
             messagebox.showinfo("Sukces", f"Zaimportowano {len(imported)} rekordów")
@@ -1131,7 +1530,7 @@ Rozkład gatunków:
         
         if filename:
             try:
-                report = self.file_organizer.generate_summary_report(self.classifications)
+                report = self._get_file_organizer().generate_summary_report(self.classifications)
                 with open(filename, 'w', encoding='utf-8') as f:
                     f.write(report)
                 messagebox.showinfo("Sukces", "Raport został zapisany!")
@@ -1150,7 +1549,7 @@ Rozkład gatunków:
         try:
             if self.theme_var.get() == "dark":
                 report_window.configure(bg="#2b2b2b")
-                report_text.configure(bg="#1f1f1f", fg="#eaeaea", insertbackground="#eaeaea")
+                report_text.configure(**_DARK_TEXT)
         except Exception:
             pass
         
@@ -1198,14 +1597,12 @@ STRUKTURA FOLDERÓW:
         
         artist, title, current_genre, confidence, folder = values
         
-        # Znajdowanie pełnej ścieżki pliku
-        file_path = None
-        for classification in self.classifications:
-            if (classification.get('artist', 'Nieznany') == artist and 
-                classification.get('title', 'Nieznany') == title):
-                file_path = classification.get('file_path')
-                break
-        
+        # Pełna ścieżka pliku wprost z indeksu wiersz -> klasyfikacja;
+        # wcześniejszy liniowy skan porównywał artystę/tytuł (w dodatku
+        # spod złych kluczy - te pola żyją pod 'metadata')
+        classification = self._item_to_classification.get(item)
+        file_path = classification.get('file_path') if classification else None
+
         if not file_path:
             messagebox.showerror("Błąd", "Nie można znaleźć ścieżki pliku")
             return
@@ -1240,7 +1637,6 @@ STRUKTURA FOLDERÓW:
         genre_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         
         # Lista gatunków
-        from config import ELECTRONIC_GENRES
         genres = list(ELECTRONIC_GENRES.keys()) + ['unknown', 'other']
         
         genre_var = tk.StringVar(value=current_genre)
@@ -1296,36 +1692,37 @@ STRUKTURA FOLDERÓW:
         current_values[3] = "1.00"     # pewność (ręczna klasyfikacja)
         
         # Mapowanie gatunku na folder
-        from config import get_genre_folder_name
         folder = get_genre_folder_name(new_genre)
         current_values[4] = folder
         
         self.results_tree.item(tree_item, values=current_values)
         
-        # Aktualizacja w danych klasyfikacji
-        for classification in self.classifications:
-            if classification.get('file_path') == file_path:
-                classification['primary_genre'] = new_genre
-                classification['confidence_score'] = 1.0
-                classification['suggested_folder'] = folder
-                classification['manual_classification'] = True
-                break
-        
+        # Aktualizacja w danych klasyfikacji - wprost przez indeks wierszy
+        classification = self._item_to_classification.get(tree_item)
+        if classification is not None:
+            classification['primary_genre'] = new_genre
+            classification['confidence_score'] = 1.0
+            classification['suggested_folder'] = folder
+            classification['manual_classification'] = True
+            # Rzadka ścieżka - odbudowa kolumn raz na kliknięcie użytkownika
+            self._rebuild_classification_columns()
+
         # Aktualizacja statystyk
         self.update_statistics()
-        
-        self.log_message(f"Ręcznie sklasyfikowano: {Path(file_path).name} -> {new_genre}")
+
+        self.log_message(f"Ręcznie sklasyfikowano: {os.path.basename(file_path)} -> {new_genre}")
 
     def check_chatgpt_status(self):
         """Sprawdza status ChatGPT i wyświetla ostrzeżenie jeśli jest problem"""
         try:
             # Sprawdź czy ChatGPT jest dostępny
-            if not self.web_searcher.openai_client:
+            searcher = self._get_web_searcher()
+            if not searcher.openai_client:
                 self.log_message("UWAGA: ChatGPT nie jest dostępny - brak klucza API")
                 return
             
             # Sprawdź czy ChatGPT został wyłączony z powodu braku środków
-            if hasattr(self.web_searcher, '_chatgpt_disabled') and self.web_searcher._chatgpt_disabled:
+            if hasattr(searcher, '_chatgpt_disabled') and searcher._chatgpt_disabled:
                 self.log_message("UWAGA: ChatGPT został wyłączony z powodu braku środków na koncie OpenAI")
                 self.log_message("Aplikacja będzie działać w trybie podstawowym bez analizy AI")
                 self.log_message("Aby włączyć ChatGPT, dodaj środki na konto: https://platform.openai.com/account/billing")
@@ -4,6 +4,8 @@ Moduł do analizy metadanych plików muzycznych
 
 import os
 import logging
+import shelve
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from mutagen import File
@@ -16,12 +18,52 @@ from config import SUPPORTED_FORMATS
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _iter_audio_paths(root: str, recursive: bool, exts: frozenset):
+    """
+    Enumeruje pliki audio przez os.scandir z jawnym stosem katalogów
+
+    DirEntry korzysta z danych readdir bez dodatkowych stat-ów, a filtr
+    rozszerzeń działa na surowych stringach przed jakimkolwiek tworzeniem
+    obiektów Path - na dużych drzewach to wielokrotnie szybsze niż rglob.
+
+    Yields:
+        Surowe ścieżki (str) plików o obsługiwanych rozszerzeniach
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                        elif (entry.is_file(follow_symlinks=False)
+                              and os.path.splitext(entry.name)[1].lower() in exts):
+                            yield entry.path
+                    except OSError:
+                        continue  # np. odwołany uchwyt/uprawnienia pojedynczego wpisu
+        except OSError as e:
+            logger.error(f"Błąd podczas skanowania katalogu {current}: {e}")
+
 class MetadataAnalyzer:
     """Klasa do analizy metadanych plików muzycznych"""
     
     def __init__(self):
         self.supported_formats = SUPPORTED_FORMATS
-        
+
+        # Trwały cache metadanych między uruchomieniami - klucz zawiera
+        # rozmiar, mtime_ns i pierwsze bajty nagłówka, więc zmieniony plik
+        # automatycznie unieważnia swój wpis; shelve nie jest wątkowo
+        # bezpieczne, stąd blokada wokół każdego dostępu
+        self._cache_lock = threading.Lock()
+        try:
+            self._scan_cache = shelve.open('scan_cache.db')
+        except Exception as e:
+            logger.warning(f"Nie można otworzyć cache metadanych: {e}")
+            self._scan_cache = None
+
     def extract_metadata(self, file_path: Path) -> Dict:
         """
         Wyciąga metadane z pliku muzycznego
@@ -155,32 +197,90 @@ class MetadataAnalyzer:
         """Sprawdza czy format pliku jest obsługiwany"""
         return file_path.suffix.lower() in self.supported_formats
     
+    def iter_candidate_paths(self, directory: Path, recursive: bool = True):
+        """
+        Generator ścieżek plików muzycznych w katalogu
+
+        Oddzielony od analizy metadanych, żeby wywołujący mógł rozdzielić
+        enumerację i odczyt tagów (np. na pulę wątków).
+
+        Args:
+            directory: Katalog do przeskanowania
+            recursive: Czy skanować rekurencyjnie
+
+        Yields:
+            Ścieżki do plików muzycznych
+        """
+        exts = self.supported_formats
+        for raw_path in _iter_audio_paths(str(directory), recursive, exts):
+            # Path tworzony tylko dla zaakceptowanych plików - reszta drzewa
+            # przechodzi przez filtr na surowych stringach
+            yield Path(raw_path)
+
+    def _cache_key(self, file_path: Path) -> str:
+        """Klucz cache'a: ścieżka + rozmiar + mtime_ns + 8 bajtów nagłówka"""
+        st = os.stat(file_path)
+        with open(file_path, 'rb') as f:
+            header = f.read(8)
+        return f"{file_path}|{st.st_size}|{st.st_mtime_ns}|{header.hex()}"
+
+    def analyze_one(self, file_path: Path) -> Dict:
+        """
+        Analizuje pojedynczy plik (worker dla puli wątków)
+
+        Ponowny skan niezmienionego pliku kosztuje tylko os.stat i odczyt
+        8 bajtów zamiast pełnego parsowania tagów.
+
+        Args:
+            file_path: Ścieżka do pliku muzycznego
+
+        Returns:
+            Słownik z metadanymi
+        """
+        if self._scan_cache is None:
+            return self.extract_metadata(file_path)
+
+        try:
+            key = self._cache_key(file_path)
+        except OSError:
+            return self.extract_metadata(file_path)
+
+        with self._cache_lock:
+            cached = self._scan_cache.get(key)
+        if cached is not None:
+            return cached
+
+        metadata = self.extract_metadata(file_path)
+        try:
+            with self._cache_lock:
+                self._scan_cache[key] = metadata
+        except Exception as e:
+            logger.debug(f"Nie można zapisać do cache metadanych: {e}")
+        return metadata
+
+    def clear_scan_cache(self):
+        """Czyści trwały cache metadanych"""
+        if self._scan_cache is None:
+            return
+        with self._cache_lock:
+            try:
+                self._scan_cache.clear()
+                self._scan_cache.sync()
+            except Exception as e:
+                logger.warning(f"Nie można wyczyścić cache metadanych: {e}")
+
     def scan_directory(self, directory: Path, recursive: bool = True) -> List[Path]:
         """
         Skanuje katalog w poszukiwaniu plików muzycznych
-        
+
         Args:
             directory: Katalog do przeskanowania
             recursive: Czy skanować rekurencyjnie
-            
+
         Returns:
             Lista ścieżek do plików muzycznych
         """
-        music_files = []
-        
-        try:
-            if recursive:
-                for file_path in directory.rglob('*'):
-                    if file_path.is_file() and self._is_supported_format(file_path):
-                        music_files.append(file_path)
-            else:
-                for file_path in directory.iterdir():
-                    if file_path.is_file() and self._is_supported_format(file_path):
-                        music_files.append(file_path)
-                        
-        except Exception as e:
-            logger.error(f"Błąd podczas skanowania katalogu {directory}: {e}")
-            
+        music_files = list(self.iter_candidate_paths(directory, recursive))
         logger.info(f"Znaleziono {len(music_files)} plików muzycznych w {directory}")
         return music_files
     
@@ -22,6 +22,20 @@ class WebSearcher:
     """Klasa do wyszukiwania informacji o utworach w internecie"""
     
     def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Music Genre Sorter/1.0'
+        })
+        self.reload_credentials()
+
+    def reload_credentials(self):
+        """
+        Przeładowuje klucze API ze zmiennych środowiskowych
+
+        Wywoływane po zapisaniu nowych kluczy w ustawieniach - sesja HTTP
+        (połączenia keep-alive, TLS) zostaje zachowana, odświeżane są tylko
+        poświadczenia i klient OpenAI.
+        """
         self.spotify_token = None
         self.spotify_token_expires = 0
         # Czytaj klucze z ENV aby możliwe były zmiany w trakcie działania
@@ -41,11 +55,6 @@ class WebSearcher:
         else:
             self.openai_client = None
             logger.warning("Brak klucza OpenAI API - funkcje ChatGPT będą wyłączone")
-        
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Music Genre Sorter/1.0'
-        })
     
     def search_track_info(self, artist: str, title: str, album: str = "", filename: str = "") -> Dict:
         """